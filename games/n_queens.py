@@ -2,12 +2,55 @@
 A module for solving the N-Queens problem using backtracking algorithm with console
 interface.
 """
+import os
 import time
+import random
 import argparse
 import threading
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pygame
+from n_queens_store import ResultStore
+
+ALGORITHMS = ("backtracking", "bitboard")
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "n_queens_results.bin")
+CHECK_INTERVAL = 4096  # Nodes between cancellation/budget checks of a headless search
+RESTART_NODES = 100  # Steps before the first restart of a completion search (doubled each time)
+
+class CancellationToken:
+    """
+    Thread-safe flag used to stop a running search from another thread.
+    """
+    def __init__(self):
+        """
+        Initializing variables.
+        """
+        self.event = threading.Event()
+
+    def cancel(self):
+        """
+        Requests the search to stop.
+        """
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        """
+        True once cancel() was called.
+        """
+        return self.event.is_set()
+
+class SearchStopped(Exception):
+    """
+    Raised inside the engines when the search has to stop early.
+    """
+
+class RestartSearch(Exception):
+    """
+    Raised inside the completion search when its restart budget is used up.
+    """
 
 class NQueensSolver:
     """
@@ -15,56 +58,360 @@ class NQueensSolver:
     Finds all possible solutions for placing N queens on an NxN chessboard
     where no two queens threaten each other.
     """
-    def __init__(self):
+    def __init__(self, store=None):
         """
         Initializing variables.
+        `store` is an optional ResultStore that serves finished results.
         """
+        self.store = store
+        self.cached = False
         self.solutions = []
+        self.solutions_count = 0
+        self.unique_count = None
         self.steps_count = 0
         self.backtracks_count = 0
-        self.current_state = None
+        self.restarts_count = 0
+        self.restart_at = None
+        self.board = None  # Live board of the running search, mutated in place
+        self.stop_reason = None
+        self.token = None
+        self.max_nodes = None
+        self.deadline = None
+        self.check_interval = CHECK_INTERVAL
+        self.next_check = 0
         self.visualization_callback = None
         self.delay = 0.1  # Delay for visualization (seconds)
 
-    def solve(self, n, visualization_callback=None, delay=0.1):
+    @property
+    def current_state(self):
+        """
+        Snapshot of the board being searched, taken only when it is read.
+        """
+        return None if self.board is None else self.board[:]
+
+    def solve(self, n, visualization_callback=None, delay=0.1, algorithm="backtracking",
+              unique=False, token=None, max_nodes=None, time_limit=None):
         """
         Solves the N-Queens problem for a board of size n x n.
+        `algorithm` is one of ALGORITHMS: "backtracking" or "bitboard".
+        With `unique` only the fundamental solutions are returned, one per
+        class of solutions equal up to rotation and reflection.
+        The search stops early when `token` (a CancellationToken) is cancelled,
+        after `max_nodes` steps, after `time_limit` seconds or on Ctrl-C; the
+        solutions found so far are returned and get_statistics() tells why.
+        With a store, a stored result is returned without searching (only the
+        store's first K solutions), and a finished search is added to it.
         """
-        self.solutions = []
+        entry = self._load_cached(n, algorithm, unique)
+        if entry:
+            self.solutions = entry["solutions"]
+            return self.solutions
+        self.solutions = list(self.iter_solutions(n, visualization_callback, delay, algorithm,
+                                                  unique, token, max_nodes, time_limit))
+        self._store_result(n, algorithm, unique, self.solutions)
+        return self.solutions
+
+    def iter_solutions(self, n, visualization_callback=None, delay=0.1, algorithm="backtracking",
+                       unique=False, token=None, max_nodes=None, time_limit=None):
+        """
+        Yields the solutions one at a time without keeping them in memory.
+        """
+        for board in self._search(n, visualization_callback, delay, algorithm, unique,
+                                  token, max_nodes, time_limit):
+            yield board[:]
+
+    def count_solutions(self, n, algorithm="backtracking", unique=False, token=None,
+                        max_nodes=None, time_limit=None):
+        """
+        Counts the solutions without building a list for any of them.
+        With `unique` the total is summed from the orbit sizes of the
+        fundamental solutions; their number is in get_statistics().
+        """
+        if self._load_cached(n, algorithm, unique):
+            return self.solutions_count
+        first = []
+        limit = self.store.first_k if self.store else 0
+        for board in self._search(n, None, 0, algorithm, unique, token, max_nodes, time_limit):
+            if len(first) < limit:
+                first.append(board[:])
+        self._store_result(n, algorithm, unique, first)
+        return self.solutions_count
+
+    def _load_cached(self, n, algorithm, unique):
+        """
+        Restores the statistics of a stored result; returns the entry or None.
+        """
+        self.cached = False
+        entry = self.store.get(n, algorithm, unique) if self.store else None
+        if entry:
+            stats = entry["statistics"]
+            self.cached = True
+            self.stop_reason = None
+            self.solutions_count = stats["solutions_count"]
+            self.unique_count = stats["unique_count"]
+            self.steps_count = stats["steps"]
+            self.backtracks_count = stats["backtracks"]
+            self.restarts_count = stats.get("restarts", 0)
+        return entry
+
+    def _store_result(self, n, algorithm, unique, solutions):
+        """
+        Adds the result of a search that ran to completion to the store.
+        """
+        if self.store and self.stop_reason is None:
+            stats = self.get_statistics()
+            del stats["cached"], stats["completed"], stats["stop_reason"]
+            self.store.put(n, algorithm, unique, solutions, stats)
+
+    def _search(self, n, visualization_callback, delay, algorithm, unique=False, token=None,
+                max_nodes=None, time_limit=None):
+        """
+        Runs the selected algorithm, yielding the live board at every solution.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        self._start(visualization_callback, delay, token, max_nodes, time_limit)
+        self.unique_count = 0 if unique else None
+        board = self.board = [-1] * n
+        self._notify()
+        if unique:
+            engine = self._left_half(board, algorithm)
+        elif algorithm == "bitboard":
+            engine = self._backtrack_bitboard(board, 0, (1 << n) - 1, 0, 0, 0)
+        else:
+            engine = self._backtrack(board, 0, n)
+        try:
+            for solution in engine:
+                if unique:
+                    forms = symmetric_forms(solution)
+                    if tuple(solution) != min(forms):
+                        continue
+                    self.unique_count += 1
+                    self.solutions_count += len(set(forms))
+                else:
+                    self.solutions_count += 1
+                yield solution
+        except SearchStopped as stop:
+            self.stop_reason = str(stop)
+        except KeyboardInterrupt:
+            self.stop_reason = "interrupted"
+
+    def _start(self, visualization_callback, delay, token, max_nodes, time_limit):
+        """
+        Resets the counters and sets up the callback and the stop conditions.
+        """
+        self.cached = False
+        self.stop_reason = None
+        self.token = token
+        self.max_nodes = max_nodes
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        # With a visualizer every node is slow anyway, so it is checked every node.
+        self.check_interval = 1 if visualization_callback else CHECK_INTERVAL
+        self.next_check = self.check_interval
+        if max_nodes is not None:
+            self.next_check = min(self.next_check, max_nodes)
+        self.solutions_count = 0
+        self.unique_count = None
         self.steps_count = 0
         self.backtracks_count = 0
+        self.restarts_count = 0
+        self.restart_at = None
         self.visualization_callback = visualization_callback
         self.delay = delay
-        board = [-1] * n
-        self.current_state = board[:]
-        if self.visualization_callback:
-            self.visualization_callback(self.current_state)
-            time.sleep(self.delay)
-        self._backtrack(board, 0, n)
-        return self.solutions
 
-    def _backtrack(self, board, row, n):
+    def complete(self, placed, visualization_callback=None, delay=0.1, token=None,
+                 max_nodes=None, time_limit=None, seed=None):
+        """
+        Completes a partial board (column per row, -1 for an empty row) with
+        the queens already placed kept fixed. The pre-placed queens are checked
+        first (see validate_placement). Only the empty rows are searched, with
+        column and diagonal bitmasks, always filling the row with the fewest
+        free columns next and trying its columns in random order (`seed`).
+        A run that takes more than RESTART_NODES steps restarts with a new
+        order and a doubled budget, so one unlucky early choice cannot stall
+        the search; a run that ends within its budget is exhaustive, so "no
+        completion" is still proven. Returns the completed board, or None when
+        there is no completion or the search was stopped (see get_statistics()).
+        """
+        validate_placement(placed)
+        n = len(placed)
+        self._start(visualization_callback, delay, token, max_nodes, time_limit)
+        board = self.board = list(placed)
+        self._notify()
+        cols = diag1 = diag2 = 0
+        for row, col in enumerate(board):
+            if col != -1:
+                cols |= 1 << col
+                diag1 |= 1 << (row + col)
+                diag2 |= 1 << (col - row + n - 1)
+        rows = [row for row, col in enumerate(board) if col == -1]
+        rng = random.Random(seed)
+        budget = RESTART_NODES
+        found = None
+        try:
+            while found is None:
+                self.restart_at = self.steps_count + budget
+                try:
+                    found = self._complete_mrv(board, rows, (1 << n) - 1, cols, diag1, diag2, rng)
+                except RestartSearch:
+                    board[:] = placed
+                    self.restarts_count += 1
+                    budget *= 2
+        except SearchStopped as stop:
+            self.stop_reason = str(stop)
+            found = False
+        except KeyboardInterrupt:
+            self.stop_reason = "interrupted"
+            found = False
+        self.solutions_count = 1 if found else 0
+        return board[:] if found else None
+
+    def _complete_mrv(self, board, rows, full, cols, diag1, diag2, rng):
+        """
+        Fills the empty `rows` of the board, most constrained row first.
+        diag1 has bit row + col and diag2 bit col - row + n - 1 set for every
+        placed queen, so shifting them by the row gives its attacked columns.
+        """
+        if not rows:
+            return True
+        n = len(board)
+        best = best_free = None
+        best_count = n + 1
+        for i, row in enumerate(rows):
+            free = full & ~(cols | (diag1 >> row) | (diag2 >> (n - 1 - row)))
+            count = bin(free).count("1")
+            if count < best_count:
+                best, best_free, best_count = i, free, count
+                if count <= 1:
+                    break
+        row = rows[best]
+        remaining = rows[:best] + rows[best + 1:]
+        choices = [col for col in range(n) if best_free >> col & 1]
+        rng.shuffle(choices)
+        for col in choices:
+            self.steps_count += 1
+            if self.steps_count >= self.next_check:
+                self._check_budget()
+            if self.steps_count >= self.restart_at:
+                raise RestartSearch()
+            board[row] = col
+            if self.visualization_callback:
+                self._notify()
+            if self._complete_mrv(board, remaining, full, cols | (1 << col),
+                                  diag1 | (1 << (row + col)), diag2 | (1 << (col - row + n - 1)),
+                                  rng):
+                return True
+            board[row] = -1
+            self.backtracks_count += 1
+            if self.visualization_callback:
+                self._notify()
+        return False
+
+    def _left_half(self, board, algorithm):
+        """
+        Searches only boards that can be the smallest form of their symmetry
+        class (see _canonical_masks): the first-row queen is in the left half,
+        since mirroring moves it to n - 1 - col, and the other rows get the
+        column restrictions that follow from it. Solutions that pass still go
+        through the full canonical check in _search.
+        """
+        n = len(board)
+        full = (1 << n) - 1
+        for col in range((n + 1) // 2):
+            self.steps_count += 1
+            if self.steps_count >= self.next_check:
+                self._check_budget()
+            board[0] = col
+            if self.visualization_callback:
+                self._notify()
+            allowed = _canonical_masks(n, col)
+            if algorithm == "bitboard":
+                bit = 1 << col
+                yield from self._backtrack_bitboard(board, 1, full, bit, (bit << 1) & full,
+                                                    bit >> 1, allowed)
+            else:
+                yield from self._backtrack(board, 1, n, allowed)
+            board[0] = -1
+            self.backtracks_count += 1
+            if self.visualization_callback:
+                self._notify()
+
+    def _backtrack(self, board, row, n, allowed=None):
         """
         Recursive backtracking function to find solutions.
+        `allowed` optionally limits each row to the columns set in its bitmask.
         """
         if row == n:
-            self.solutions.append(board[:])
+            yield board
             return
         for col in range(n):
             self.steps_count += 1
+            if self.steps_count >= self.next_check:
+                self._check_budget()
+            if allowed and not allowed[row] >> col & 1:
+                continue
             if self._is_safe(board, row, col):
                 board[row] = col
-                self.current_state = board[:]
                 if self.visualization_callback:
-                    self.visualization_callback(self.current_state)
-                    time.sleep(self.delay)
-                self._backtrack(board, row + 1, n)
+                    self._notify()
+                yield from self._backtrack(board, row + 1, n, allowed)
                 board[row] = -1
-                self.current_state = board[:]
                 self.backtracks_count += 1
                 if self.visualization_callback:
-                    self.visualization_callback(self.current_state)
-                    time.sleep(self.delay)
+                    self._notify()
+
+    def _backtrack_bitboard(self, board, row, full, cols, diag1, diag2, allowed=None):
+        """
+        Backtracking over bitmasks of the occupied columns and diagonals.
+        Only free columns are visited (lowest set bit first), so every step
+        is a placement and no safety scan is needed.
+        `allowed` optionally limits each row to the columns set in its bitmask.
+        """
+        if row == len(board):
+            yield board
+            return
+        free = (allowed[row] if allowed else full) & ~(cols | diag1 | diag2)
+        while free:
+            bit = free & -free
+            free ^= bit
+            self.steps_count += 1
+            if self.steps_count >= self.next_check:
+                self._check_budget()
+            board[row] = bit.bit_length() - 1
+            if self.visualization_callback:
+                self._notify()
+            yield from self._backtrack_bitboard(board, row + 1, full, cols | bit,
+                                                ((diag1 | bit) << 1) & full, (diag2 | bit) >> 1,
+                                                allowed)
+            board[row] = -1
+            self.backtracks_count += 1
+            if self.visualization_callback:
+                self._notify()
+
+    def _check_budget(self):
+        """
+        Raises SearchStopped when the search was cancelled or ran out of its
+        node or time budget; otherwise schedules the next check.
+        """
+        if self.token is not None and self.token.cancelled:
+            raise SearchStopped("cancelled")
+        if self.max_nodes is not None and self.steps_count >= self.max_nodes:
+            raise SearchStopped("node budget")
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchStopped("time budget")
+        self.next_check = self.steps_count + self.check_interval
+        if self.max_nodes is not None:
+            self.next_check = min(self.next_check, self.max_nodes)
+
+    def _notify(self):
+        """
+        Hands a snapshot of the board to the visualization callback, if any.
+        Headless runs never copy the board.
+        """
+        if self.visualization_callback:
+            self.visualization_callback(self.current_state)
+            if self.delay > 0:
+                time.sleep(self.delay)
 
     def _is_safe(self, board, row, col):
         """
@@ -77,6 +424,33 @@ class NQueensSolver:
                 return False
         return True
 
+    def count_parallel(self, n, workers=None, prefix_rows=1):
+        """
+        Counts all solutions for an n x n board in parallel worker processes.
+        The tree is split by the first one or two rows (see split_prefixes),
+        each subtree is counted in a worker and the weighted counts are summed.
+        Returns a report with the total, per-subtree and per-worker timings.
+        """
+        tasks = split_prefixes(n, prefix_rows)
+        weights = dict(tasks)
+        start = time.perf_counter()
+        subtrees = []
+        worker_times = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_count_subtree, n, prefix) for prefix, _ in tasks]
+            for future in as_completed(futures):
+                prefix, count, seconds, pid = future.result()
+                subtrees.append({"prefix": prefix, "count": count * weights[prefix],
+                                 "time": seconds, "worker": pid})
+                worker_times[pid] = worker_times.get(pid, 0.0) + seconds
+        subtrees.sort(key=lambda task: task["prefix"])
+        return {
+            "solutions_count": sum(task["count"] for task in subtrees),
+            "time": time.perf_counter() - start,
+            "subtrees": subtrees,
+            "worker_times": worker_times
+        }
+
     def get_statistics(self):
         """
         Returns statistics of the algorithm execution.
@@ -84,7 +458,12 @@ class NQueensSolver:
         return {
             "steps": self.steps_count,
             "backtracks": self.backtracks_count,
-            "solutions_count": len(self.solutions)
+            "restarts": self.restarts_count,
+            "solutions_count": self.solutions_count,
+            "unique_count": self.unique_count,
+            "completed": self.stop_reason is None,
+            "stop_reason": self.stop_reason,
+            "cached": self.cached
         }
 
     def print_solution(self, solution):
@@ -104,6 +483,127 @@ class NQueensSolver:
             print(line)
         print("+" + "-" * (2 * n + 1) + "+")
 
+def validate_placement(placed):
+    """
+    Checks a partial board (column per row, -1 for an empty row).
+    Raises ValueError for an out-of-range column or two attacking queens.
+    """
+    n = len(placed)
+    queens = []
+    for row, col in enumerate(placed):
+        if col == -1:
+            continue
+        if not 0 <= col < n:
+            raise ValueError(f"Column {col} in row {row} is outside the {n}x{n} board")
+        for other_row, other_col in queens:
+            if other_col == col or abs(other_col - col) == row - other_row:
+                raise ValueError(f"Queens in rows {other_row} and {row} attack each other")
+        queens.append((row, col))
+
+def parse_placement(text, n):
+    """
+    Parses pre-placed queens written as "row,col" pairs separated by spaces
+    (0-based, e.g. "0,3 5,1") into a board with -1 for empty rows.
+    """
+    board = [-1] * n
+    for pair in text.split():
+        row, col = (int(value) for value in pair.split(","))
+        if not 0 <= row < n:
+            raise ValueError(f"Row {row} is outside the {n}x{n} board")
+        if board[row] != -1:
+            raise ValueError(f"Row {row} already has a queen")
+        board[row] = col
+    return board
+
+def symmetric_forms(solution):
+    """
+    Returns the 8 rotations and reflections of a solution as tuples
+    (duplicates included for symmetric solutions).
+    """
+    n = len(solution)
+    forms = []
+    current = list(solution)
+    for _ in range(4):
+        forms.append(tuple(current))
+        forms.append(tuple(n - 1 - col for col in current))
+        rotated = [0] * n
+        for row, col in enumerate(current):
+            rotated[col] = n - 1 - row
+        current = rotated
+    return forms
+
+def _canonical_masks(n, first):
+    """
+    Per-row bitmasks of the columns a queen may use when the first-row queen
+    is in column `first` and the solution is to be the smallest of its 8
+    symmetric forms. The first entries of the other forms are the last-row
+    column and the rows of the queens in columns 0 and n - 1, each read from
+    both ends. None of them may be smaller than `first`:
+    - the last-row queen lies in columns first .. n - 1 - first;
+    - columns 0 and n - 1 are only used in rows first .. n - 1 - first;
+    - with the first queen in the middle column of an odd board, the second
+      row stays left of the middle, as its mirror image is the same class.
+    """
+    full = (1 << n) - 1
+    edges = 1 | (1 << (n - 1))
+    allowed = [full] * n
+    for row in range(1, n):
+        if row < first or row > n - 1 - first:
+            allowed[row] &= ~edges
+    allowed[n - 1] &= full & ~((1 << first) - 1) & ((1 << (n - first)) - 1)
+    if n > 1 and n % 2 == 1 and first == n // 2:
+        allowed[1] &= (1 << first) - 1
+    return allowed
+
+def _count_completions(full, cols, diag1, diag2):
+    """
+    Counts the ways to fill the remaining rows given the bitmasks of the
+    occupied columns and diagonals.
+    """
+    if cols == full:
+        return 1
+    count = 0
+    free = full & ~(cols | diag1 | diag2)
+    while free:
+        bit = free & -free
+        free ^= bit
+        count += _count_completions(full, cols | bit, ((diag1 | bit) << 1) & full,
+                                    (diag2 | bit) >> 1)
+    return count
+
+def _count_subtree(n, prefix):
+    """
+    Counts the solutions whose first rows hold the queens in `prefix`.
+    Runs in a worker process; returns (prefix, count, seconds, worker pid).
+    """
+    start = time.perf_counter()
+    full = (1 << n) - 1
+    cols = diag1 = diag2 = 0
+    for col in prefix:
+        bit = 1 << col
+        if (cols | diag1 | diag2) & bit:
+            return prefix, 0, time.perf_counter() - start, os.getpid()
+        cols, diag1, diag2 = cols | bit, ((diag1 | bit) << 1) & full, (diag2 | bit) >> 1
+    return prefix, _count_completions(full, cols, diag1, diag2), time.perf_counter() - start, os.getpid()
+
+def split_prefixes(n, prefix_rows=1):
+    """
+    Splits the search tree into subtrees by the queens of the first
+    `prefix_rows` rows. Only the left half of the first row is used: a
+    solution and its mirror image are counted together through the weight.
+    Returns a list of (prefix, weight).
+    """
+    tasks = []
+    for first in range((n + 1) // 2):
+        weight = 1 if n % 2 == 1 and first == n // 2 else 2
+        if prefix_rows == 1:
+            tasks.append(((first,), weight))
+        else:
+            for second in range(n):
+                if abs(second - first) > 1:
+                    tasks.append(((first, second), weight))
+    return tasks
+
 class ConsoleNQueens:
     """
     Console interface for solving the N-Queens problem.
@@ -113,7 +613,7 @@ class ConsoleNQueens:
         """
         Initializing variables.
         """
-        self.solver = NQueensSolver()
+        self.solver = NQueensSolver(ResultStore(STORE_PATH))
 
     def run(self):
         """
@@ -129,31 +629,41 @@ class ConsoleNQueens:
                 elif n < 4:
                     print("Chessboard size must be at least 4.")
                     continue
+                placement = input("Pre-placed queens as row,col pairs (Enter for none): ").strip()
+                if placement:
+                    self.run_completion(n, placement)
+                    print("\n" + "-" * 50 + "\n")
+                    continue
                 print(f"\nSolving for n = {n}...")
                 start_time = time.time()
-                solutions = self.solver.solve(n)
+                solutions_count = self.solver.count_solutions(n)
                 end_time = time.time()
                 stats = self.solver.get_statistics()
-                print(f"\nFound {len(solutions)} solutions.")
+                if not stats["completed"]:
+                    print(f"\nSearch {stats['stop_reason']}, partial results:")
+                print(f"\nFound {solutions_count} solutions.")
+                if stats["cached"]:
+                    print("(Served from stored results; steps and backtracks are from the stored search.)")
                 print(f"Execution time: {end_time - start_time:.4f} seconds")
                 print(f"Number of steps: {stats['steps']}")
                 print(f"Number of backtracks: {stats['backtracks']}")
-                if solutions:
+                if solutions_count:
                     while True:
                         choice = input("\nShow solutions? (y/n): ").lower()
                         if choice == "y":
                             how_many = input("How many solutions to show? (all/number): ")
                             if how_many.lower() == "all":
-                                limit = len(solutions)
+                                limit = solutions_count
                             else:
                                 try:
-                                    limit = min(int(how_many), len(solutions))
+                                    limit = min(int(how_many), solutions_count)
                                 except ValueError:
                                     print("Invalid value. Showing the first solution.")
                                     limit = 1
-                            for i in range(limit):
+                            solutions = islice(self.solver.iter_solutions(n, algorithm="bitboard"), limit)
+                            for i, solution in enumerate(solutions):
                                 print(f"\nSolution #{i+1}:")
-                                self.solver.print_solution(solutions[i])
+                                self.solver.print_solution(solution)
                             break
                         elif choice == "n":
                             break
@@ -166,6 +676,61 @@ class ConsoleNQueens:
                 print("\nProgram terminated by user.")
                 break
 
+    def run_completion(self, n, placement):
+        """
+        Completes a board with pre-placed queens and prints the result.
+        """
+        try:
+            board = parse_placement(placement, n)
+            start_time = time.time()
+            solution = self.solver.complete(board)
+        except ValueError as e:
+            print(f"Invalid placement: {e}")
+            return
+        end_time = time.time()
+        stats = self.solver.get_statistics()
+        if solution:
+            print("\nCompletion found:")
+            self.solver.print_solution(solution)
+        elif stats["completed"]:
+            print("\nThese queens cannot be completed to a solution.")
+        else:
+            print(f"\nSearch {stats['stop_reason']} before a completion was found.")
+        print(f"Execution time: {end_time - start_time:.4f} seconds")
+        print(f"Number of steps: {stats['steps']}")
+        print(f"Number of backtracks: {stats['backtracks']}")
+
+
+class LatestStateBuffer:
+    """
+    Bounded latest-wins buffer between the solver thread and the UI.
+    Holds at most one pending board; a newer board replaces an unread one.
+    """
+    def __init__(self):
+        """
+        Initializing variables.
+        """
+        self.lock = threading.Lock()
+        self.pending = None
+        self.dropped = 0
+
+    def put(self, board):
+        """
+        Stores a board, dropping the pending one if it was not taken yet.
+        """
+        with self.lock:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = board
+
+    def take(self):
+        """
+        Returns the latest board (or None) and empties the buffer.
+        """
+        with self.lock:
+            board, self.pending = self.pending, None
+            return board
+
 
 class VisualNQueens:
     """
@@ -178,12 +743,18 @@ class VisualNQueens:
         self.root = root
         self.root.title("N-Queens Solver")
         self.root.geometry("800x600")
-        self.solver = NQueensSolver()
+        self.solver = NQueensSolver(ResultStore(STORE_PATH))
         self.solutions = []
         self.current_solution_index = 0
         self.board_size = 8
         self.animation_speed = 100
         self.is_solving = False
+        self.closed = False
+        self.cancel_token = CancellationToken()
+        self.frame_buffer = LatestStateBuffer()
+        self.frame_ms = 16  # At most one redraw per frame (~60 fps)
+        self.layout = None
+        self.queen_items = {}
         self._create_widgets()
 
     def _create_widgets(self):
@@ -272,16 +843,25 @@ relief="sunken", anchor=tk.W)
         self.prev_button.config(state=tk.DISABLED)
         self.next_button.config(state=tk.DISABLED)
 
-    def _draw_empty_board(self):
+    def _board_geometry(self):
         """
-        Draws an empty chessboard.
+        Returns (cell_size, offset_x, offset_y) of the board on the canvas.
         """
-        self.canvas.delete("all")
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
         cell_size = min(width, height) // self.board_size
         offset_x = (width - cell_size * self.board_size) // 2
         offset_y = (height - cell_size * self.board_size) // 2
+        return cell_size, offset_x, offset_y
+
+    def _draw_empty_board(self):
+        """
+        Draws an empty chessboard.
+        """
+        self.canvas.delete("all")
+        self.queen_items = {}
+        cell_size, offset_x, offset_y = self._board_geometry()
+        self.layout = (self.board_size, cell_size, offset_x, offset_y)
         for row in range(self.board_size):
             for col in range(self.board_size):
                 x1 = offset_x + col * cell_size
@@ -294,25 +874,51 @@ relief="sunken", anchor=tk.W)
     def _draw_board(self, board):
         """
         Draws a chessboard with queens.
+        The squares are redrawn only when the size or geometry changed;
+        otherwise only the queens whose column changed are moved.
         """
-        self._draw_empty_board()
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        cell_size = min(width, height) // self.board_size
-        offset_x = (width - cell_size * self.board_size) // 2
-        offset_y = (height - cell_size * self.board_size) // 2
-        for row in range(len(board)):
-            col = board[row]
-            if col != -1:
-                x = offset_x + col * cell_size + cell_size / 2
-                y = offset_y + row * cell_size + cell_size / 2
-                queen_size = cell_size * 0.8
-                self.canvas.create_oval(
+        cell_size, offset_x, offset_y = self._board_geometry()
+        if self.layout != (self.board_size, cell_size, offset_x, offset_y):
+            self._draw_empty_board()
+        queen_size = cell_size * 0.8
+        for row, col in enumerate(board):
+            items = self.queen_items.get(row)
+            if items and items[0] == col:
+                continue
+            if col == -1:
+                if items:
+                    self.canvas.itemconfigure(items[1], state=tk.HIDDEN)
+                    self.canvas.itemconfigure(items[2], state=tk.HIDDEN)
+                    self.queen_items[row] = (col, items[1], items[2])
+                continue
+            x = offset_x + col * cell_size + cell_size / 2
+            y = offset_y + row * cell_size + cell_size / 2
+            if items:
+                oval, text = items[1], items[2]
+                self.canvas.coords(oval, x - queen_size/2, y - queen_size/2,
+                                   x + queen_size/2, y + queen_size/2)
+                self.canvas.coords(text, x, y)
+                self.canvas.itemconfigure(oval, state=tk.NORMAL)
+                self.canvas.itemconfigure(text, state=tk.NORMAL)
+            else:
+                oval = self.canvas.create_oval(
                     x - queen_size/2, y - queen_size/2,
                     x + queen_size/2, y + queen_size/2,
                     fill="#e63946", outline="black", width=2)
-                self.canvas.create_text(
+                text = self.canvas.create_text(
                     x, y, text="♛", fill="white", font=("Arial", int(queen_size * 0.6)))
+            self.queen_items[row] = (col, oval, text)
+
+    def _render_frame(self):
+        """
+        Draws the latest state pushed by the solver thread, at most once per
+        frame, and reschedules itself while the solver is running.
+        """
+        board = self.frame_buffer.take()
+        if board is not None:
+            self._draw_board(board)
+        if self.is_solving or self.frame_buffer.pending is not None:
+            self.root.after(self.frame_ms, self._render_frame)
 
     def _solve(self):
         """
@@ -321,12 +927,14 @@ relief="sunken", anchor=tk.W)
         if self.is_solving:
             return
         self.is_solving = True
+        self.cancel_token = CancellationToken()
         self.solve_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self._reset_solution_navigation()
         self.solve_thread = threading.Thread(target=self._solve_thread)
         self.solve_thread.daemon = True
         self.solve_thread.start()
+        self.root.after(self.frame_ms, self._render_frame)
 
     def _solve_thread(self):
         """
@@ -336,43 +944,63 @@ relief="sunken", anchor=tk.W)
             self.status_var.set("Solving the problem...")
             delay = self.animation_speed / 1000
             start_time = time.time()
-            self.solutions = self.solver.solve(self.board_size, self._update_board, delay)
+            self.solutions = self.solver.solve(self.board_size, self._update_board, delay,
+                                               token=self.cancel_token)
             end_time = time.time()
-            if not self.is_solving:
+            if self.closed:
                 return
             stats = self.solver.get_statistics()
             self.steps_var.set(f"Steps: {stats['steps']}")
             self.backtracks_var.set(f"Backtracks: {stats['backtracks']}")
             self.time_var.set(f"Time: {end_time - start_time:.4f} sec")
-            self.status_var.set(f"Found {len(self.solutions)} solutions")
+            if stats["completed"] and stats["solutions_count"] > len(self.solutions):
+                self.status_var.set(f"Found {stats['solutions_count']} solutions "
+                                    f"(first {len(self.solutions)} stored)")
+            elif stats["completed"]:
+                self.status_var.set(f"Found {len(self.solutions)} solutions")
+            else:
+                self.status_var.set(f"Stopped by user: {len(self.solutions)} solutions found so far")
             if self.solutions:
                 self.current_solution_index = 0
                 self.solution_label.config(text=f"Solution: 1/{len(self.solutions)}")
-                self._draw_board(self.solutions[0])
+                self.frame_buffer.put(self.solutions[0])
                 if len(self.solutions) > 1:
                     self.next_button.config(state=tk.NORMAL)
         except Exception as e:
             self.status_var.set(f"Error: {str(e)}")
         finally:
             self.is_solving = False
-            self.root.after(0, lambda: self.solve_button.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
+            if not self.closed:
+                self.root.after(0, self._render_frame)
+                self.root.after(0, lambda: self.solve_button.config(state=tk.NORMAL))
+                self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
 
     def _update_board(self, board):
         """
         Updates the chessboard display during animation.
+        Only hands the board to the frame buffer; _render_frame draws it.
         """
         if not self.is_solving:
             return
-        self.root.after(0, lambda b=board[:]: self._draw_board(b))
+        self.frame_buffer.put(board)
 
     def _stop(self):
         """
         Stops solving.
         """
         self.is_solving = False
+        self.cancel_token.cancel()
         self.status_var.set("Stopped by user")
 
+    def _close(self):
+        """
+        Stops a running search and closes the window.
+        """
+        self.closed = True
+        self.is_solving = False
+        self.cancel_token.cancel()
+        self.root.destroy()
+
     def _prev_solution(self):
         """
         Shows the previous solution.
@@ -412,10 +1040,7 @@ def run_visual_version():
     """
     root = tk.Tk()
     app = VisualNQueens(root)
-    def on_closing():
-        app.is_solving = False
-        root.destroy()
-    root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.protocol("WM_DELETE_WINDOW", app._close)
     def on_resize(event):
         if event.widget == root:
             app._draw_board([-1] * app.board_size)
@@ -423,13 +1048,51 @@ def run_visual_version():
     root.mainloop()
 
 
+def run_parallel_count(n, workers=None, prefix_rows=1):
+    """
+    Counts the solutions for size n in parallel and prints the timing report.
+    """
+    report = NQueensSolver().count_parallel(n, workers, prefix_rows)
+    print(f"n = {n}: {report['solutions_count']} solutions in {report['time']:.4f} seconds")
+    print(f"Subtrees: {len(report['subtrees'])}")
+    for pid, seconds in sorted(report["worker_times"].items()):
+        print(f"  Worker {pid}: {seconds:.4f} seconds")
+    slowest = max(report["subtrees"], key=lambda task: task["time"])
+    print(f"Slowest subtree {slowest['prefix']}: {slowest['time']:.4f} seconds")
+
+
+def run_state_benchmark(sizes=range(8, 14), algorithm="bitboard"):
+    """
+    Compares nodes per second of the headless fast path with a run that
+    snapshots the board on every placement and undo, as the solver used to.
+    """
+    solver = NQueensSolver()
+    print(f"{'n':>3} {'snapshot nodes/sec':>20} {'headless nodes/sec':>20} {'speedup':>8}")
+    for n in sizes:
+        rates = []
+        for callback in (lambda state: None, None):
+            start = time.perf_counter()
+            for _ in solver._search(n, callback, 0, algorithm):
+                pass
+            rates.append(solver.steps_count / (time.perf_counter() - start))
+        print(f"{n:>3} {rates[0]:>20,.0f} {rates[1]:>20,.0f} {rates[1] / rates[0]:>7.2f}x")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='N-Queens Solver')
-    parser.add_argument('mode', choices=['console', 'visual'], help='Display mode')
+    parser.add_argument('mode', choices=['console', 'visual', 'count', 'bench'], help='Display mode')
+    parser.add_argument('-n', type=int, default=8, help='Board size for count mode')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for count mode')
+    parser.add_argument('--prefix-rows', type=int, choices=[1, 2], default=1,
+                        help='Rows used to split the search tree in count mode')
     args = parser.parse_args()
 
     if args.mode == 'console':
         run_console_version()
+    elif args.mode == 'count':
+        run_parallel_count(args.n, args.workers, args.prefix_rows)
+    elif args.mode == 'bench':
+        run_state_benchmark()
     elif args.mode == 'visual':
         run_visual_version()
     else:
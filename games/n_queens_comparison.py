@@ -1,18 +1,22 @@
 """
 Module for comparing different N-Queens solving algorithms.
 """
+import sys
 import time
 import random
 from collections import defaultdict
-from queue import Queue
+from array import array
 import matplotlib.pyplot as plt
 
 class NQueensComparison:
     """
     A class for comparing different N-Queens solving algorithms:
     - Backtracking (the original algorithm)
+    - Bitboard backtracking (columns and diagonals as integer bitmasks)
     - BFS (Breadth-First Search)
     - Greedy approach
+    - Constructive closed-form placement and min-conflicts local search
+      (single placements for very large boards)
     """
     def __init__(self):
         """
@@ -20,6 +24,7 @@ class NQueensComparison:
         """
         self.stats = {
             'backtracking': defaultdict(dict),
+            'bitboard': defaultdict(dict),
             'bfs': defaultdict(dict),
             'greedy': defaultdict(dict)
         }
@@ -100,43 +105,101 @@ class NQueensComparison:
         }
         return solutions, stats
 
+    def bitboard_solver(self, n, visualization_callback=None, delay=0):
+        """
+        Solve N-Queens using backtracking over bitmasks of the occupied
+        columns and diagonals; only free columns are visited.
+        Returns all solutions.
+        """
+        solutions = []
+        steps = 0
+        backtracks = 0
+        full = (1 << n) - 1
+        placement = [-1] * n
+
+        def backtrack(row, cols, diag1, diag2):
+            nonlocal steps, backtracks
+            if row == n:
+                solutions.append(placement[:])
+                return
+            free = full & ~(cols | diag1 | diag2)
+            while free:
+                bit = free & -free
+                free ^= bit
+                steps += 1
+                placement[row] = bit.bit_length() - 1
+                if visualization_callback:
+                    visualization_callback(placement[:])
+                    if delay > 0:
+                        time.sleep(delay)
+                backtrack(row + 1, cols | bit, ((diag1 | bit) << 1) & full, (diag2 | bit) >> 1)
+                placement[row] = -1
+                backtracks += 1
+                if visualization_callback:
+                    visualization_callback(placement[:])
+                    if delay > 0:
+                        time.sleep(delay)
+        backtrack(0, 0, 0, 0)
+        stats = {
+            "steps": steps,
+            "backtracks": backtracks,
+            "solutions_count": len(solutions)
+        }
+        return solutions, stats
+
     def bfs_solver(self, n, visualization_callback=None, delay=0):
         """
-        Solve N-Queens using Breadth-First Search.
+        Solve N-Queens using Breadth-First Search, expanding one row (level)
+        of the frontier at a time.
+        Each frontier node is four 64-bit integers kept in parallel arrays:
+        the placement packed a few bits per row and the occupied column and
+        diagonal masks. Supports N <= 16, where packed placements fit 64 bits.
         Returns all solutions found.
         """
+        shift = max(1, (n - 1).bit_length())
+        if n * shift > 64:
+            raise ValueError(f"BFS frontier packing supports N <= 16, got {n}")
         solutions = []
         steps = 0
         backtracks = 0
-        queue = Queue()
-        queue.put(([], 0))
-        while not queue.empty():
-            placement, row = queue.get()
-            steps += 1
-            if row == n:
-                solutions.append(placement)
-                continue
-            for col in range(n):
-                valid = True
-                for r, c in enumerate(placement):
-                    if c == col or r + c == row + col or r - c == row - col:
-                        valid = False
-                        backtracks += 1
-                        break
-                if valid:
-                    new_placement = placement + [col]
+        full = (1 << n) - 1
+        digit = (1 << shift) - 1
+        frontier = [array('Q', [0]) for _ in range(4)]
+        peak_frontier = 1
+        peak_bytes = 0
+        for row in range(n):
+            placements, cols_next, diag1_next, diag2_next = level = [array('Q') for _ in range(4)]
+            for placed, cols, diag1, diag2 in zip(*frontier):
+                steps += 1
+                free = full & ~(cols | diag1 | diag2)
+                backtracks += n - bin(free).count("1")
+                while free:
+                    bit = free & -free
+                    free ^= bit
+                    placement = placed | ((bit.bit_length() - 1) << (row * shift))
+                    placements.append(placement)
+                    cols_next.append(cols | bit)
+                    diag1_next.append(((diag1 | bit) << 1) & full)
+                    diag2_next.append((diag2 | bit) >> 1)
                     if visualization_callback:
                         current_state = [-1] * n
-                        for r, c in enumerate(new_placement):
-                            current_state[r] = c
+                        for r in range(row + 1):
+                            current_state[r] = (placement >> (r * shift)) & digit
                         visualization_callback(current_state)
                         if delay > 0:
                             time.sleep(delay)
-                    queue.put((new_placement, row + 1))
+            peak_bytes = max(peak_bytes, sum(len(a) * a.itemsize for a in frontier + level))
+            peak_frontier = max(peak_frontier, len(placements))
+            frontier = level
+        for placement in frontier[0]:
+            steps += 1
+            solutions.append([(placement >> (r * shift)) & digit for r in range(n)])
         stats = {
             "steps": steps,
             "backtracks": backtracks,
-            "solutions_count": len(solutions)
+            "solutions_count": len(solutions),
+            "peak_frontier": peak_frontier,
+            "peak_frontier_bytes": peak_bytes
         }
         return solutions, stats
 
@@ -186,12 +249,293 @@ class NQueensComparison:
         }
         return solutions, stats
 
+    def constructive_solver(self, n, visualization_callback=None, delay=0):
+        """
+        Build one solution in O(N) from the explicit construction: even
+        columns then odd columns (1-based), with the standard fix-ups when
+        N mod 6 is 2 or 3. Works for every N except 2 and 3.
+        """
+        solutions = []
+        if n not in (2, 3):
+            evens = list(range(2, n + 1, 2))
+            odds = list(range(1, n + 1, 2))
+            if n % 6 == 2:
+                odds[0], odds[1] = odds[1], odds[0]
+                odds.remove(5)
+                odds.append(5)
+            elif n % 6 == 3:
+                evens.append(evens.pop(0))
+                odds = odds[2:] + odds[:2]
+            placement = [col - 1 for col in evens + odds]
+            if visualization_callback:
+                visualization_callback(placement[:])
+                if delay > 0:
+                    time.sleep(delay)
+            solutions.append(placement)
+        stats = {
+            "steps": n,
+            "backtracks": 0,
+            "solutions_count": len(solutions)
+        }
+        return solutions, stats
+
+    def min_conflicts_solver(self, n, max_steps=None, visualization_callback=None, delay=0,
+                             seed=None):
+        """
+        Find one solution by min-conflicts local search over permutations.
+        Queens start on a permutation placed greedily without diagonal clashes
+        where possible; conflicted queens are then swapped with random rows
+        whenever the swap lowers the number of attacking pairs. Occupancy
+        counters per diagonal make every conflict check and update O(1).
+        Restarts when `max_steps` swaps (default 10 * N) do not finish.
+        """
+        rng = random.Random(seed)
+        max_steps = max_steps or 10 * n
+        steps = 0
+        backtracks = 0
+        solutions = []
+        while not solutions and n not in (2, 3):
+            placement = list(range(n))
+            diag1 = [0] * (2 * n - 1)
+            diag2 = [0] * (2 * n - 1)
+            # Greedy start: put a clash-free column on each row while free
+            # columns are easy to hit, and the leftovers in any order.
+            row = 0
+            for _ in range(3 * n):
+                if row >= n:
+                    break
+                other = rng.randrange(row, n)
+                col = placement[other]
+                if not diag1[row + col] and not diag2[row - col + n - 1]:
+                    placement[row], placement[other] = col, placement[row]
+                    diag1[row + col] += 1
+                    diag2[row - col + n - 1] += 1
+                    row += 1
+            for r in range(row, n):
+                diag1[r + placement[r]] += 1
+                diag2[r - placement[r] + n - 1] += 1
+            conflicted = [r for r in range(n)
+                          if diag1[r + placement[r]] > 1 or diag2[r - placement[r] + n - 1] > 1]
+            for _ in range(max_steps):
+                while conflicted:
+                    i = conflicted[-1]
+                    if diag1[i + placement[i]] > 1 or diag2[i - placement[i] + n - 1] > 1:
+                        break
+                    conflicted.pop()
+                if not conflicted:
+                    solutions.append(placement)
+                    break
+                steps += 1
+                j = rng.randrange(n)
+                if j == i:
+                    continue
+                ci, cj = placement[i], placement[j]
+                delta = 0
+                for r, c in ((i, ci), (j, cj)):
+                    diag1[r + c] -= 1
+                    diag2[r - c + n - 1] -= 1
+                    delta -= diag1[r + c] + diag2[r - c + n - 1]
+                for r, c in ((i, cj), (j, ci)):
+                    delta += diag1[r + c] + diag2[r - c + n - 1]
+                    diag1[r + c] += 1
+                    diag2[r - c + n - 1] += 1
+                if delta < 0:
+                    placement[i], placement[j] = cj, ci
+                    conflicted.append(j)
+                    if visualization_callback:
+                        visualization_callback(placement[:])
+                        if delay > 0:
+                            time.sleep(delay)
+                else:
+                    for r, c in ((i, cj), (j, ci)):
+                        diag1[r + c] -= 1
+                        diag2[r - c + n - 1] -= 1
+                    for r, c in ((i, ci), (j, cj)):
+                        diag1[r + c] += 1
+                        diag2[r - c + n - 1] += 1
+                    backtracks += 1
+            else:
+                backtracks += 1
+        stats = {
+            "steps": steps,
+            "backtracks": backtracks,
+            "solutions_count": len(solutions)
+        }
+        return solutions, stats
+
+    def completion_solver(self, placed, visualization_callback=None, delay=0, seed=None,
+                          max_nodes=None, time_limit=None, restart_nodes=100):
+        """
+        Complete a partial board (column per row, -1 for an empty row) keeping
+        its queens fixed. Only the empty rows are searched, with column and
+        diagonal bitmasks, filling the row with the fewest free columns first
+        and trying its columns in random order. A run that takes more than
+        `restart_nodes` steps restarts with a new order and a doubled budget;
+        a run that ends within its budget is exhaustive.
+        Stops after `max_nodes` steps or `time_limit` seconds (stats
+        "timed_out"). Returns the completion found, or an empty list.
+        """
+        n = len(placed)
+        rng = random.Random(seed)
+        steps = 0
+        backtracks = 0
+        restarts = 0
+        restart_at = 0
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        full = (1 << n) - 1
+        board = list(placed)
+        cols = diag1 = diag2 = 0
+        for row, col in enumerate(board):
+            if col != -1:
+                bits = (1 << col, 1 << (row + col), 1 << (col - row + n - 1))
+                if cols & bits[0] or diag1 & bits[1] or diag2 & bits[2]:
+                    raise ValueError(f"Pre-placed queen in row {row} is attacked")
+                cols, diag1, diag2 = cols | bits[0], diag1 | bits[1], diag2 | bits[2]
+
+        class Restart(Exception):
+            pass
+
+        class OutOfBudget(Exception):
+            pass
+
+        def complete(rows, cols, diag1, diag2):
+            nonlocal steps, backtracks
+            if not rows:
+                return True
+            best, best_free, best_count = None, None, n + 1
+            for i, row in enumerate(rows):
+                free = full & ~(cols | (diag1 >> row) | (diag2 >> (n - 1 - row)))
+                count = bin(free).count("1")
+                if count < best_count:
+                    best, best_free, best_count = i, free, count
+                    if count <= 1:
+                        break
+            row = rows[best]
+            remaining = rows[:best] + rows[best + 1:]
+            choices = [col for col in range(n) if best_free >> col & 1]
+            rng.shuffle(choices)
+            for col in choices:
+                steps += 1
+                if max_nodes is not None and steps > max_nodes:
+                    raise OutOfBudget()
+                if deadline is not None and steps % 1024 == 0 and time.perf_counter() > deadline:
+                    raise OutOfBudget()
+                if steps >= restart_at:
+                    raise Restart()
+                board[row] = col
+                if visualization_callback:
+                    visualization_callback(board[:])
+                    if delay > 0:
+                        time.sleep(delay)
+                if complete(remaining, cols | (1 << col), diag1 | (1 << (row + col)),
+                            diag2 | (1 << (col - row + n - 1))):
+                    return True
+                board[row] = -1
+                backtracks += 1
+            return False
+        found = None
+        timed_out = False
+        budget = restart_nodes
+        empty_rows = [row for row in range(n) if board[row] == -1]
+        while found is None:
+            restart_at = steps + budget
+            try:
+                found = complete(empty_rows, cols, diag1, diag2)
+            except Restart:
+                board[:] = placed
+                restarts += 1
+                budget *= 2
+            except OutOfBudget:
+                timed_out = True
+                found = False
+        solutions = [board] if found else []
+        stats = {
+            "steps": steps,
+            "backtracks": backtracks,
+            "restarts": restarts,
+            "timed_out": timed_out,
+            "solutions_count": len(solutions)
+        }
+        return solutions, stats
+
+    def is_valid_placement(self, placement):
+        """
+        Check in O(N) that a placement (column per row) has no two queens
+        sharing a column or diagonal.
+        """
+        n = len(placement)
+        return (len(set(placement)) == n
+                and len({r + c for r, c in enumerate(placement)}) == n
+                and len({r - c for r, c in enumerate(placement)}) == n)
+
+    def benchmark_large(self, sizes=(10**3, 10**4, 10**5, 10**6), trials=1):
+        """
+        Benchmark the single-placement solvers on very large boards.
+        Every placement found is verified.
+        """
+        solvers = {
+            'constructive': self.constructive_solver,
+            'min_conflicts': self.min_conflicts_solver
+        }
+        results = {method: defaultdict(lambda: defaultdict(list)) for method in solvers}
+        for size in sizes:
+            print(f"\nBenchmarking board size {size}x{size}...")
+            for trial in range(1, trials + 1):
+                print(f"  Trial {trial}/{trials}:")
+                for method, solver in solvers.items():
+                    start = time.time()
+                    solutions, stats = solver(size)
+                    elapsed = time.time() - start
+                    valid = bool(solutions) and self.is_valid_placement(solutions[0])
+                    results[method][size]['time'].append(elapsed)
+                    results[method][size]['solutions'].append(stats["solutions_count"])
+                    results[method][size]['steps'].append(stats["steps"])
+                    results[method][size]['backtracks'].append(stats["backtracks"])
+                    print(f"    {method} time: {elapsed:.4f} seconds, steps: {stats['steps']}, "
+                          f"valid: {valid}")
+        return results
+
+    def benchmark_completion(self, sizes=(50, 100, 150, 200), fixed=0.2, trials=3, seed=None,
+                             time_limit=10.0):
+        """
+        Benchmark completion of partial boards. Each instance keeps a random
+        `fixed` fraction of the queens of a constructive solution, so every
+        instance has at least one completion. Each instance gets at most
+        `time_limit` seconds; instances that hit it are reported as timeouts.
+        """
+        rng = random.Random(seed)
+        results = {'completion': defaultdict(lambda: defaultdict(list))}
+        for size in sizes:
+            print(f"\nBenchmarking completion on {size}x{size}...")
+            solution = self.constructive_solver(size)[0][0]
+            timeouts = 0
+            for trial in range(1, trials + 1):
+                kept = set(rng.sample(range(size), int(size * fixed)))
+                placed = [col if row in kept else -1 for row, col in enumerate(solution)]
+                start = time.time()
+                solutions, stats = self.completion_solver(placed, seed=rng.random(),
+                                                          time_limit=time_limit)
+                elapsed = time.time() - start
+                valid = bool(solutions) and self.is_valid_placement(solutions[0])
+                timeouts += stats["timed_out"]
+                results['completion'][size]['time'].append(elapsed)
+                results['completion'][size]['solutions'].append(stats["solutions_count"])
+                results['completion'][size]['steps'].append(stats["steps"])
+                results['completion'][size]['backtracks'].append(stats["backtracks"])
+                results['completion'][size]['timeouts'].append(stats["timed_out"])
+                outcome = "timeout" if stats["timed_out"] else f"valid: {valid}"
+                print(f"  Trial {trial}/{trials}: {len(kept)} fixed queens, time: {elapsed:.4f} "
+                      f"seconds, steps: {stats['steps']}, restarts: {stats['restarts']}, {outcome}")
+            print(f"  Timeouts: {timeouts}/{trials}")
+        return results
+
     def benchmark_solvers(self, sizes, trials=5):
         """
-        Benchmark the three algorithms across different board sizes.
+        Benchmark the algorithms across different board sizes.
         """
         results = {
             'backtracking': defaultdict(lambda: defaultdict(list)),
+            'bitboard': defaultdict(lambda: defaultdict(list)),
             'bfs': defaultdict(lambda: defaultdict(list)),
             'greedy': defaultdict(lambda: defaultdict(list))
         }
@@ -216,30 +560,52 @@ class NQueensComparison:
                 results['backtracking'][size]['steps'].append(steps_count)
                 results['backtracking'][size]['backtracks'].append(backtracks_count)
                 print(f"    Backtracking time: {bt_time:.4f} seconds, solutions: {solutions_count}")
-                if size <= 10:
+                start = time.time()
+                try:
+                    solutions, stats = self.bitboard_solver(size)
+                    solutions_count = stats["solutions_count"]
+                    steps_count = stats["steps"]
+                    backtracks_count = stats["backtracks"]
+                except Exception as e:
+                    print(f"    Bitboard failed: {e}")
+                    solutions_count = 0
+                    steps_count = 0
+                    backtracks_count = 0
+                bitboard_time = time.time() - start
+                results['bitboard'][size]['time'].append(bitboard_time)
+                results['bitboard'][size]['solutions'].append(solutions_count)
+                results['bitboard'][size]['steps'].append(steps_count)
+                results['bitboard'][size]['backtracks'].append(backtracks_count)
+                print(f"    Bitboard time: {bitboard_time:.4f} seconds, solutions: {solutions_count}")
+                if size <= 13:
                     start = time.time()
                     try:
                         solutions, stats = self.bfs_solver(size)
                         solutions_count = stats["solutions_count"]
                         steps_count = stats["steps"]
                         backtracks_count = stats["backtracks"]
+                        peak_bytes = stats["peak_frontier_bytes"]
                     except Exception as e:
                         print(f"    BFS failed: {e}")
                         solutions_count = 0
                         steps_count = 0
                         backtracks_count = 0
+                        peak_bytes = 0
                     bfs_time = time.time() - start
                     results['bfs'][size]['time'].append(bfs_time)
                     results['bfs'][size]['solutions'].append(solutions_count)
                     results['bfs'][size]['steps'].append(steps_count)
                     results['bfs'][size]['backtracks'].append(backtracks_count)
-                    print(f"    BFS time: {bfs_time:.4f} seconds, solutions: {solutions_count}")
+                    results['bfs'][size]['memory'].append(peak_bytes)
+                    print(f"    BFS time: {bfs_time:.4f} seconds, solutions: {solutions_count}, "
+                          f"peak frontier: {peak_bytes / 1024:.1f} KiB")
                 else:
                     print("    BFS skipped for large board size")
                     results['bfs'][size]['time'].append(None)
                     results['bfs'][size]['solutions'].append(None)
                     results['bfs'][size]['steps'].append(None)
                     results['bfs'][size]['backtracks'].append(None)
+                    results['bfs'][size]['memory'].append(None)
                 start = time.time()
                 try:
                     solutions, stats = self.greedy_solver(size)
@@ -266,7 +632,7 @@ class NQueensComparison:
         sizes = sorted([size for size in results['backtracking'].keys()])
         plt.figure(figsize=(15, 12))
         plt.subplot(2, 2, 1)
-        for method in ['backtracking', 'bfs', 'greedy']:
+        for method in ['backtracking', 'bitboard', 'bfs', 'greedy']:
             times = []
             valid_sizes = []
             for size in sizes:
@@ -284,7 +650,7 @@ class NQueensComparison:
         plt.legend()
         plt.yscale('log')
         plt.subplot(2, 2, 2)
-        for method in ['backtracking', 'bfs', 'greedy']:
+        for method in ['backtracking', 'bitboard', 'bfs', 'greedy']:
             steps = []
             valid_sizes = []
             for size in sizes:
@@ -319,5 +685,24 @@ def run_benchmark():
     )
     comparison.show_all_plots(results)
 
+def run_large_benchmark():
+    """
+    Run the single-placement benchmark for N = 10^3 .. 10^6.
+    """
+    print("Starting large-board N-Queens benchmark...")
+    NQueensComparison().benchmark_large()
+
+def run_completion_benchmark():
+    """
+    Run the completion benchmark for N = 50 .. 200.
+    """
+    print("Starting N-Queens completion benchmark...")
+    NQueensComparison().benchmark_completion()
+
 if __name__ == "__main__":
-    run_benchmark()
+    if len(sys.argv) > 1 and sys.argv[1] == "large":
+        run_large_benchmark()
+    elif len(sys.argv) > 1 and sys.argv[1] == "completion":
+        run_completion_benchmark()
+    else:
+        run_benchmark()
@@ -0,0 +1,123 @@
+"""
+Persistent store of N-Queens results keyed by board size and algorithm.
+
+For every (N, algorithm, unique) key the store keeps the search statistics
+(solution counts, steps, backtracks) and the first K solutions. Solutions are
+packed one byte per column (two bytes for N > 256), so the file stays small
+even for sizes with many solutions.
+
+File layout: a sequence of entries, each a JSON header line followed by the
+packed solutions whose length the header gives.
+"""
+import json
+import os
+from array import array
+
+
+def pack_solutions(solutions, n):
+    """
+    Pack solutions (column per row) into bytes; returns (data, width).
+    """
+    width = 1 if n <= 256 else 2
+    values = [col for solution in solutions for col in solution]
+    data = bytes(values) if width == 1 else array('H', values).tobytes()
+    return data, width
+
+def unpack_solutions(data, n, width):
+    """
+    Unpack bytes written by pack_solutions back into a list of solutions.
+    """
+    if width == 1:
+        values = list(data)
+    else:
+        values = array('H')
+        values.frombytes(data)
+        values = values.tolist()
+    return [values[i:i + n] for i in range(0, len(values), n)]
+
+
+class ResultStore:
+    """
+    Store of N-Queens results with up to `first_k` solutions per entry.
+    When `path` is given, entries are loaded from that file and every new
+    entry is written back to it.
+    """
+    def __init__(self, path=None, first_k=1000):
+        """
+        Initializing variables.
+        """
+        self.path = path
+        self.first_k = first_k
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, n, algorithm, unique=False):
+        """
+        Returns {"statistics": ..., "solutions": [...]} for a key, or None.
+        """
+        entry = self.entries.get((n, algorithm, unique))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        header, data = entry
+        return {
+            "statistics": dict(header["statistics"]),
+            "solutions": unpack_solutions(data, n, header["width"])
+        }
+
+    def put(self, n, algorithm, unique, solutions, statistics):
+        """
+        Stores the statistics and the first `first_k` solutions of a finished search.
+        """
+        data, width = pack_solutions(solutions[:self.first_k], n)
+        header = {
+            "n": n,
+            "algorithm": algorithm,
+            "unique": unique,
+            "statistics": statistics,
+            "width": width,
+            "bytes": len(data)
+        }
+        self.entries[(n, algorithm, unique)] = (header, data)
+        if self.path:
+            self.save()
+
+    def get_statistics(self):
+        """
+        Returns hit/miss counters of the store.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries)
+        }
+
+    def load(self):
+        """
+        Load stored entries from `path`.
+        """
+        self.entries = {}
+        with open(self.path, "rb") as f:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                header = json.loads(line)
+                data = f.read(header["bytes"])
+                self.entries[(header["n"], header["algorithm"], header["unique"])] = (header, data)
+
+    def save(self):
+        """
+        Write all entries to `path` (through a temporary file, so an
+        interrupted write never leaves a truncated store).
+        """
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            for header, data in self.entries.values():
+                f.write(json.dumps(header).encode() + b"\n")
+                f.write(data)
+        os.replace(temp_path, self.path)
@@ -3,78 +3,21 @@ Sudoku Solver Visualizer
 
 This script generates Sudoku puzzles, solves them using backtracking, and provides
 both console-based and Pygame-based visualizations of the solving process.
+The solver itself lives in sudoku_core and can be imported without a display.
 """
-import random
+import sys
 import time
-import math
 import pygame
 from colorama import init, Fore, Back, Style
+from sudoku_core import (
+    BatchReport, BoardMasks, CELL_STRATEGIES, SolveStats, backtracking_search, board_geometry,
+    count_solutions, find_empty_cell, find_most_constrained_cell, format_puzzle,
+    generate_sudoku, is_valid, iter_digits, iter_puzzles, iter_solutions, parse_puzzle, percentile,
+    read_puzzles, remove_clues_unique, solve_backtracking, solve_batch, solve_stream
+)
 
 init(autoreset = True)
 
-# Sudoku Tools
-def is_valid(board, row, col, num):
-    """
-    Check if placing `num` at board[row][col] is valid according to Sudoku rules.
-    """
-    size = len(board)
-    base = int(size**0.5)
-    for i in range(size):
-        if num in (board[row][i], board[i][col]):
-            return False
-    start_row = base * (row // base)
-    start_col = base * (col // base)
-    for i in range(start_row, start_row + base):
-        for j in range(start_col, start_col + base):
-            if board[i][j] == num:
-                return False
-    return True
-
-def find_empty_cell(board):
-    """
-    Find the next empty cell (value 0) in the Sudoku board.
-    Returns a tuple (row, col) or None if no empty cells remain.
-    """
-    size = len(board)
-    for row in range(size):
-        for col in range(size):
-            if board[row][col] == 0:
-                return row, col
-    return None
-
-def generate_sudoku(clues=25):
-    """
-    Generate a Sudoku puzzle with a given number of clues.
-    The more clues, the easier the puzzle.
-    """
-    board = [[0] * 9 for _ in range(9)]
-    solve_backtracking(board)
-    cells = [(i, j) for i in range(9) for j in range(9)]
-    random.shuffle(cells)
-    for i in range(81 - clues):
-        r, c = cells[i]
-        board[r][c] = 0
-    return board
-
-def solve_backtracking(board):
-    """
-    Solve the Sudoku puzzle using backtracking.
-    Returns True if the puzzle is solvable.
-    """
-    empty = find_empty_cell(board)
-    if not empty:
-        return True
-    row, col = empty
-    size = len(board)
-    for num in range(1, size + 1):
-        if is_valid(board, row, col, num):
-            board[row][col] = num
-            if solve_backtracking(board):
-                return True
-            board[row][col] = 0
-    return False
-
-
 #Console Display
 def print_board(board, highlight=None):
     """
@@ -101,22 +44,16 @@ def visual_solve_console(board, delay=0.05):
     Solve the board with step-by-step output to the console.
     Includes optional delay to slow down visualization.
     """
-    empty = find_empty_cell(board)
-    if not empty:
-        return True
-    row, col = empty
-    size = len(board)
-    for num in range(1, size + 1):
-        if is_valid(board, row, col, num):
-            board[row][col] = num
-            print_board(board, highlight=(row, col))
-            time.sleep(delay)
-            if visual_solve_console(board, delay):
-                return True
-            board[row][col] = 0
-            print_board(board, highlight=(row, col))
-            time.sleep(delay / 2)
-    return False
+    def on_place(row, col, num):
+        print_board(board, highlight=(row, col))
+        time.sleep(delay)
+
+    def on_remove(row, col):
+        print_board(board, highlight=(row, col))
+        time.sleep(delay / 2)
+
+    search = backtracking_search(BoardMasks(board), on_place=on_place, on_remove=on_remove)
+    return next(search, None) is not None
 
 def run_console_version(clues):
     """
@@ -147,10 +84,20 @@ def run_console_version(clues):
 WIDTH, HEIGHT = 540, 540
 CELL = WIDTH // 9
 
-pygame.init()
-win = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Sudoku Solver Visualizer")
-font = pygame.font.SysFont("arial", 35)
+win = None
+font = None
+
+def init_display():
+    """
+    Open the Pygame window. Called on first use so importing this module
+    does not start pygame.
+    """
+    global win, font
+    if win is None:
+        pygame.init()
+        win = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Sudoku Solver Visualizer")
+        font = pygame.font.SysFont("arial", 35)
 
 def draw_board(board, highlight=None):
     """
@@ -179,31 +126,26 @@ def visual_solve_pygame(board):
     """
     Solve the Sudoku puzzle with visual updates using Pygame.
     """
-    empty = find_empty_cell(board)
-    if not empty:
-        return True
-    row, col = empty
-    size = len(board)
-    for num in range(1, size + 1):
-        if is_valid(board, row, col, num):
-            board[row][col] = num
-            draw_board(board, highlight=(row, col))
-            pygame.time.delay(100)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-            if visual_solve_pygame(board):
-                return True
-            board[row][col] = 0
-            draw_board(board, highlight=(row, col))
-            pygame.time.delay(50)
-    return False
+    def on_place(row, col, num):
+        draw_board(board, highlight=(row, col))
+        pygame.time.delay(100)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+
+    def on_remove(row, col):
+        draw_board(board, highlight=(row, col))
+        pygame.time.delay(50)
+
+    search = backtracking_search(BoardMasks(board), on_place=on_place, on_remove=on_remove)
+    return next(search, None) is not None
 
 def run_pygame_version(clues):
     """
     Run the graphical version of the Sudoku solver using Pygame.
     Press SPACE to start solving the puzzle.
     """
+    init_display()
     board = generate_sudoku(clues=clues)
     running = True
     solving = False
@@ -220,6 +162,52 @@ def run_pygame_version(clues):
             solving = False
     pygame.quit()
 
+# Puzzle File Solving
+def run_solve_file(path="-", count_limit=None):
+    """
+    Solve puzzles from a file (or stdin for "-") one line at a time.
+    Solutions are written to stdout as they finish (or, with `count_limit`,
+    the number of solutions capped at that value). A malformed line prints
+    "Invalid puzzle" on stdout and a line-numbered warning on stderr, and the
+    run goes on. Throughput and latency statistics go to stderr at the end,
+    also when the run is interrupted or fails.
+    """
+    latencies = []
+    nodes = 0
+    invalid = 0
+
+    def report_invalid(line_number, line, error):
+        nonlocal invalid
+        invalid += 1
+        print("Invalid puzzle", flush=True)
+        print(f"Line {line_number}: {error}", file=sys.stderr)
+
+    start = time.perf_counter()
+    source = sys.stdin if path == "-" else open(path)
+    try:
+        for board, result, seconds, stats in solve_stream(source, count_limit=count_limit,
+                                                          on_error=report_invalid):
+            if count_limit:
+                print(result, flush=True)
+            else:
+                print(format_puzzle(board) if result else "No solution", flush=True)
+            latencies.append(seconds)
+            nodes += stats.nodes
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        count = len(latencies)
+        print(f"Puzzles: {count}", file=sys.stderr)
+        print(f"Invalid puzzles: {invalid}", file=sys.stderr)
+        print(f"Puzzles/sec: {count / elapsed if elapsed else 0.0:.1f}", file=sys.stderr)
+        for pct in (50, 95, 99):
+            print(f"p{pct} latency: {percentile(latencies, pct) * 1000:.3f} ms", file=sys.stderr)
+        print(f"Nodes explored: {nodes}", file=sys.stderr)
+
 def choose_difficulty():
     """
     Prompt the user to select a difficulty level.
@@ -244,13 +232,19 @@ def choose_difficulty():
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='Sudoku Solver')
-    parser.add_argument('mode', choices=['console', 'visual'], help='Display mode')
+    parser.add_argument('mode', choices=['console', 'visual', 'solve-file'], help='Display mode')
     parser.add_argument('difficulty', type=int, nargs='?', default=30, 
                        help='Number of clues (difficulty)')
+    parser.add_argument('-i', '--input', default='-',
+                       help='Puzzle file for solve-file mode, one puzzle per line (default: stdin)')
+    parser.add_argument('--count', type=int, metavar='K',
+                       help='In solve-file mode, print the number of solutions capped at K')
 
     args = parser.parse_args()
 
     if args.mode == 'console':
         run_console_version(None)
+    elif args.mode == 'solve-file':
+        run_solve_file(args.input, args.count)
     else:
         run_pygame_version(args.difficulty)
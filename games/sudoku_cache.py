@@ -0,0 +1,284 @@
+"""
+Sudoku solution cache keyed by a canonical puzzle form.
+
+Puzzles that differ only by digit relabelling, band/stack permutation, row or
+column permutation inside a band/stack, or transposition share one canonical
+form, so a repeated or symmetric puzzle is answered from the cache instead of
+a fresh search.
+"""
+import json
+import os
+from collections import OrderedDict
+from itertools import groupby, islice, permutations, product
+from sudoku_core import format_puzzle, parse_puzzle, solve_backtracking
+
+
+# Canonical Form
+def _tie_groups(items, key):
+    """
+    Sort `items` by `key` and split them into groups of equal keys.
+    """
+    ordered = sorted(items, key=key)
+    return [list(group) for _, group in groupby(ordered, key=key)]
+
+def _group_orders(groups):
+    """
+    Yield every ordering obtained by permuting the members of each tie group.
+    """
+    for parts in product(*(permutations(group) for group in groups)):
+        yield [item for part in parts for item in part]
+
+def _line_orders(signatures, base, limit):
+    """
+    Return up to `limit` orderings of the lines (rows or columns) of one axis.
+    Bands are ordered by the sorted signatures of their lines and lines inside
+    a band by their own signature; only lines with equal signatures are permuted.
+    """
+    bands = list(range(base))
+    band_key = lambda b: sorted(signatures[b * base:(b + 1) * base])
+    inner = {
+        b: list(islice(_group_orders(_tie_groups(
+            range(b * base, (b + 1) * base), key=lambda i: signatures[i])), limit))
+        for b in bands
+    }
+    orders = []
+    for band_order in islice(_group_orders(_tie_groups(bands, key=band_key)), limit):
+        for lines in product(*(inner[b] for b in band_order)):
+            orders.append([i for part in lines for i in part])
+            if len(orders) >= limit:
+                return orders
+    return orders
+
+def _line_signatures(grid, crossing_counts, base):
+    """
+    Signature of every row of `grid`: its clue count, the sorted clue counts of
+    the crossing lines it hits and its sorted clue counts per box segment.
+    """
+    size = len(grid)
+    return [
+        (sum(1 for v in row if v),
+         tuple(sorted(crossing_counts[j] for j in range(size) if row[j])),
+         tuple(sorted(sum(1 for v in row[s * base:(s + 1) * base] if v) for s in range(base))))
+        for row in grid
+    ]
+
+def _signatures(grid, base):
+    """
+    Clue-position signatures of every row and column that do not depend on the
+    order of the other axis or on the digit labels.
+    """
+    size = len(grid)
+    columns = [list(col) for col in zip(*grid)]
+    row_counts = [sum(1 for v in row if v) for row in grid]
+    col_counts = [sum(1 for v in col if v) for col in columns]
+    rows = _line_signatures(grid, col_counts, base)
+    cols = _line_signatures(columns, row_counts, base)
+    # One refinement round: add the signatures of the crossing lines.
+    rows2 = [(rows[r], tuple(sorted(cols[c] for c in range(size) if grid[r][c])))
+             for r in range(size)]
+    cols2 = [(cols[c], tuple(sorted(rows[r] for r in range(size) if grid[r][c])))
+             for c in range(size)]
+    return rows2, cols2
+
+def _relabelled(grid, row_order, col_order):
+    """
+    Read the grid in the given row/column order, renaming digits 1, 2, ... in
+    order of first appearance. Returns (key tuple, digit mapping).
+    """
+    mapping = {}
+    key = []
+    for r in row_order:
+        row = grid[r]
+        for c in col_order:
+            num = row[c]
+            if num:
+                label = mapping.get(num)
+                if label is None:
+                    label = mapping[num] = len(mapping) + 1
+                key.append(label)
+            else:
+                key.append(0)
+    return tuple(key), mapping
+
+def canonicalize(board, limit=64):
+    """
+    Return (canonical board, transform) for a puzzle.
+    The canonical board is the lexicographically smallest relabelled reading
+    among the transposition and line orderings tried; at most `limit`
+    (row ordering, column ordering) pairs are tried per orientation, so
+    puzzles with many symmetric lines (low-clue boards) stay cheap but may map
+    to different (always equivalent) forms.
+    `transform` is (transposed, row_order, col_order, mapping) for undo_transform.
+    """
+    size = len(board)
+    base = int(size**0.5)
+    best = None
+    for transposed in (False, True):
+        grid = [list(col) for col in zip(*board)] if transposed else board
+        row_sigs, col_sigs = _signatures(grid, base)
+        row_orders = _line_orders(row_sigs, base, limit)
+        col_orders = _line_orders(col_sigs, base, max(1, limit // len(row_orders)))
+        for row_order in row_orders:
+            for col_order in col_orders:
+                key, mapping = _relabelled(grid, row_order, col_order)
+                if best is None or key < best[0]:
+                    best = (key, (transposed, row_order, col_order, mapping))
+    key, transform = best
+    canonical = [list(key[r * size:(r + 1) * size]) for r in range(size)]
+    return canonical, transform
+
+def undo_transform(solution, transform):
+    """
+    Map a solution of the canonical board back onto the original puzzle.
+    """
+    transposed, row_order, col_order, mapping = transform
+    size = len(solution)
+    inverse = {label: num for num, label in mapping.items()}
+    spare = iter(num for num in range(1, size + 1) if num not in mapping)
+    for label in range(len(mapping) + 1, size + 1):
+        inverse[label] = next(spare)
+    grid = [[0] * size for _ in range(size)]
+    for i, r in enumerate(row_order):
+        for j, c in enumerate(col_order):
+            grid[r][c] = inverse[solution[i][j]]
+    return [list(col) for col in zip(*grid)] if transposed else grid
+
+
+# Solution Cache
+class SolutionCache:
+    """
+    LRU cache of Sudoku solutions keyed by canonical puzzle form.
+    Exact repeats are answered from a second LRU keyed by the puzzle string,
+    so they skip canonicalization as well as the search.
+    When `path` is given, entries are loaded from and saved to that JSON file.
+    """
+    def __init__(self, maxsize=4096, path=None):
+        """
+        Initializing variables.
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.exact = OrderedDict()
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def solve(self, board):
+        """
+        Return a solved copy of `board` (or None if it has no solution),
+        searching only when no equivalent puzzle is cached.
+        """
+        puzzle = format_puzzle(board)
+        if puzzle in self.exact:
+            self.exact_hits += 1
+            self.exact.move_to_end(puzzle)
+            solution = self.exact[puzzle]
+            return None if solution is None else parse_puzzle(solution)
+        canonical, transform = canonicalize(board)
+        key = format_puzzle(canonical)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+        else:
+            self.misses += 1
+            solution = format_puzzle(canonical) if solve_backtracking(canonical, "mrv", True) else None
+            self._remember(self.entries, key, solution)
+        if solution is not None:
+            solution = undo_transform(parse_puzzle(solution), transform)
+        self._remember(self.exact, puzzle, None if solution is None else format_puzzle(solution))
+        return solution
+
+    def _remember(self, entries, key, solution):
+        """
+        Add an entry to one of the LRU maps, evicting the oldest one when full.
+        """
+        entries[key] = solution
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def get_statistics(self):
+        """
+        Returns hit/miss counters of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "size": len(self.entries)
+        }
+
+    def load(self):
+        """
+        Load cached entries from `path`.
+        """
+        if not self.path:
+            raise ValueError("SolutionCache has no path to load from")
+        with open(self.path) as f:
+            data = json.load(f)
+        # Older files hold only the canonical entries.
+        if "canonical" in data:
+            self.entries = OrderedDict(data["canonical"])
+            self.exact = OrderedDict(data.get("exact", {}))
+        else:
+            self.entries = OrderedDict(data)
+        for entries in (self.entries, self.exact):
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def save(self):
+        """
+        Write the cached entries to `path`.
+        """
+        if not self.path:
+            raise ValueError("SolutionCache has no path to save to")
+        with open(self.path, "w") as f:
+            json.dump({"canonical": self.entries, "exact": self.exact}, f)
+
+
+# Well-known hard 9x9 puzzles (several ms each for the MRV + propagation solver).
+HARD_PUZZLES = [
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+]
+
+def run_cache_benchmark(repeats=50, seed=1):
+    """
+    Time a stream of hard puzzles, each seen `repeats` times, half as exact
+    repeats and half as relabelled and transposed variants, solved directly
+    and through the cache.
+    """
+    import random
+    import time
+    rng = random.Random(seed)
+    stream = []
+    for _ in range(repeats):
+        for puzzle in HARD_PUZZLES:
+            board = parse_puzzle(puzzle)
+            if rng.random() < 0.5:
+                perm = list(range(1, 10))
+                rng.shuffle(perm)
+                board = [[perm[num - 1] if num else 0 for num in row] for row in zip(*board)]
+            stream.append(board)
+    start = time.perf_counter()
+    for board in stream:
+        solve_backtracking([list(row) for row in board], "mrv", True)
+    direct = time.perf_counter() - start
+    cache = SolutionCache()
+    start = time.perf_counter()
+    for board in stream:
+        cache.solve(board)
+    cached = time.perf_counter() - start
+    print(f"Puzzles: {len(stream)} ({len(HARD_PUZZLES)} distinct)")
+    print(f"Direct solving: {direct:.3f} s ({direct / len(stream) * 1000:.3f} ms per puzzle)")
+    print(f"Through cache: {cached:.3f} s ({cached / len(stream) * 1000:.3f} ms per puzzle)")
+    print(f"Cache statistics: {cache.get_statistics()}")
+
+
+if __name__ == "__main__":
+    run_cache_benchmark()
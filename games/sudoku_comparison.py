@@ -1,16 +1,19 @@
 import time
 import random
 import copy
+import tracemalloc
 from collections import defaultdict
 import matplotlib.pyplot as plt
-from sudoku import is_valid
+from sudoku_core import BoardMasks, CELL_STRATEGIES, SolveStats, iter_digits, remove_clues_unique
 
 
 
 # Sudoku Generator
-def generate_sudoku(N, clues):
+def generate_sudoku(N, clues, unique=False):
     """
     Generate a Sudoku board of size NxN with a given number of clues.
+    With `unique`, clues are only removed while the puzzle keeps exactly one
+    solution, so the board may keep more clues than requested.
     Returns:
         list: A 2D list representing the generated Sudoku board.
     """
@@ -29,6 +32,8 @@ def generate_sudoku(N, clues):
     nums = shuffle(range(1, N + 1))
 
     board = [[nums[pattern(r, c)] for c in cols] for r in rows]
+    if unique:
+        return remove_clues_unique(board, clues)
     squares = N * N
     empties = squares - clues
     for _ in range(empties):
@@ -39,97 +44,347 @@ def generate_sudoku(N, clues):
 
 
 # DFS Solver
-def dfs_solver(board):
+def dfs_solver(board, copy_free=False, stats=None):
     """
     Solve the Sudoku puzzle using Depth First Search (DFS) algorithm.
     Args:
         board (list): The Sudoku puzzle to be solved.
+        copy_free (bool): Keep one mutable board and an undo trail instead of
+            copying the board for every pushed state.
+        stats (SolveStats): Optional search counters.
     Returns:
         list: A solved Sudoku board, or None if no solution exists.
     """
+    if stats is None:
+        stats = SolveStats()
+    if copy_free:
+        return _dfs_trail(board, stats)
     size = len(board)
-    stack = [(0, 0, copy.deepcopy(board))]
+    stack = [(0, 0, 0, BoardMasks(copy.deepcopy(board)))]
     while stack:
-        row, col, b = stack.pop()
+        row, col, depth, state = stack.pop()
         if row == size:
-            return b
-        if b[row][col] != 0:
-            next_col = (col + 1) % size
-            next_row = row + (col + 1) // size
-            stack.append((next_row, next_col, b))
+            stats.searched = depth
+            stats.max_depth = max(stats.max_depth, depth)
+            return state.board
+        next_col = (col + 1) % size
+        next_row = row + (col + 1) // size
+        if state.board[row][col] != 0:
+            stack.append((next_row, next_col, depth, state))
             continue
-        for num in range(1, size+1):
-            if is_valid(b, row, col, num):
-                new_board = copy.deepcopy(b)
-                new_board[row][col] = num
-                next_col = (col + 1) % size
-                next_row = row + (col + 1) // size
-                stack.append((next_row, next_col, new_board))
+        stats.nodes += 1
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+        candidates = state.candidates(row, col)
+        stats.checks += state.checks
+        if not candidates:
+            stats.backtracks += 1
+        for num in iter_digits(candidates):
+            child = state.copy()
+            child.place(row, col, num)
+            stack.append((next_row, next_col, depth + 1, child))
     return None
 
+def _dfs_trail(board, stats):
+    """
+    Copy-free iterative DFS: the stack holds the untried candidate mask of each
+    empty cell on the current path and `trail` the (row, col) placements to undo.
+    """
+    size = len(board)
+    state = BoardMasks(board)
+    cells = [(r, c) for r in range(size) for c in range(size) if board[r][c] == 0]
+    if not cells:
+        return board
+    trail = []
+    stack = [state.candidates(*cells[0])]
+    stats.nodes += 1
+    solution = None
+    while stack:
+        mask = stack[-1]
+        if not mask:
+            stack.pop()
+            if trail:
+                state.remove(*trail.pop())
+                stats.backtracks += 1
+            continue
+        bit = mask & -mask
+        stack[-1] = mask ^ bit
+        row, col = cells[len(trail)]
+        state.place(row, col, bit.bit_length() - 1)
+        trail.append((row, col))
+        if len(trail) > stats.max_depth:
+            stats.max_depth = len(trail)
+        if len(trail) == len(cells):
+            stats.searched = len(trail)
+            solution = board
+            break
+        stack.append(state.candidates(*cells[len(trail)]))
+        stats.nodes += 1
+    stats.checks += state.checks
+    return solution
+
 # Backtracking Solver
-def backtracking_solver(board):
+def backtracking_solver(board, strategy="first", propagate=False, stats=None):
     """
     Solve the Sudoku puzzle using the Backtracking algorithm.
     Args:
         board (list): The Sudoku puzzle to be solved.
+        strategy (str): Cell selection, "first" empty cell or "mrv" (fewest candidates).
+        propagate (bool): Fill naked and hidden singles before every branch.
+        stats (SolveStats): Optional search counters.
     Returns:
         list: A solved Sudoku board, or None if no solution exists.
     """
-    size = len(board)
-    for row in range(size):
-        for col in range(size):
-            if board[row][col] == 0:
-                for num in range(1, size+1):
-                    if is_valid(board, row, col, num):
-                        board[row][col] = num
-                        if backtracking_solver(board):
-                            return board
-                        board[row][col] = 0
-                return None
-    return board
+    if stats is None:
+        stats = SolveStats()
+    state = BoardMasks(board)
+    solved = _backtrack(state, CELL_STRATEGIES[strategy], propagate, stats, 0)
+    stats.checks += state.checks
+    return board if solved else None
+
+def _backtrack(state, select_cell, propagate, stats, depth):
+    """
+    Recursive step of backtracking_solver over a BoardMasks state.
+    """
+    stats.nodes += 1
+    if depth > stats.max_depth:
+        stats.max_depth = depth
+    trail = []
+    if propagate:
+        if not state.propagate(trail):
+            state.undo(trail, 0)
+            return False
+        stats.propagated += len(trail)
+    empty = select_cell(state)
+    if not empty:
+        return True
+    row, col = empty
+    for num in iter_digits(state.candidates(row, col)):
+        state.place(row, col, num)
+        stats.searched += 1
+        if _backtrack(state, select_cell, propagate, stats, depth + 1):
+            return True
+        state.remove(row, col)
+        stats.searched -= 1
+        stats.backtracks += 1
+    stats.propagated -= len(trail)
+    state.undo(trail, 0)
+    return False
 
 
 # Greedy Solver
-def greedy_solver(board):
+def greedy_solver(board, stats=None):
     """
     Solve the Sudoku puzzle using the Greedy algorithm.
     
     Args:
         board (list): The Sudoku puzzle to be solved.
+        stats (SolveStats): Optional search counters.
     
     Returns:
         list: A solved Sudoku board, or None if no solution exists.
     """
+    if stats is None:
+        stats = SolveStats()
     size = len(board)
+    state = BoardMasks(board)
     empty = [(r, c) for r in range(size) for c in range(size) if board[r][c] == 0]
     random.shuffle(empty)
+    solution = board
     for row, col in empty:
-        for num in range(1, size+1):
-            if is_valid(board, row, col, num):
-                board[row][col] = num
+        stats.nodes += 1
+        candidates = state.candidates(row, col)
+        if not candidates:
+            solution = None
+            break
+        state.place(row, col, (candidates & -candidates).bit_length() - 1)
+        stats.searched += 1
+        stats.max_depth = stats.searched
+    stats.checks += state.checks
+    return solution
+
+
+# Exact Cover (Algorithm X) Solver
+def _exact_cover(board):
+    """
+    Build the exact-cover matrix of a Sudoku board of size N = k*k.
+    Columns are the cell, row-digit, column-digit and box-digit constraints;
+    the matrix row (r*N + c)*N + d - 1 places digit d at (r, c).
+    Returns (X, Y) with the clues already selected, or None if the clues clash.
+    """
+    size = len(board)
+    base = int(size**0.5)
+    area = size * size
+    Y = {}
+    for r in range(size):
+        for c in range(size):
+            b = (r // base) * base + c // base
+            for d in range(size):
+                Y[(r * size + c) * size + d] = [
+                    r * size + c,
+                    area + r * size + d,
+                    2 * area + c * size + d,
+                    3 * area + b * size + d
+                ]
+    X = {j: set() for j in range(4 * area)}
+    for i, cols in Y.items():
+        for j in cols:
+            X[j].add(i)
+    for r in range(size):
+        for c in range(size):
+            if board[r][c]:
+                i = (r * size + c) * size + board[r][c] - 1
+                if any(j not in X for j in Y[i]):
+                    return None
+                _cover(X, Y, i)
+    return X, Y
+
+def _cover(X, Y, i):
+    """
+    Select matrix row i: remove its columns and every row clashing with it.
+    Returns the removed columns so _uncover can restore them.
+    """
+    removed = []
+    for j in Y[i]:
+        for k in X[j]:
+            for other in Y[k]:
+                if other != j:
+                    X[other].remove(k)
+        removed.append(X.pop(j))
+    return removed
+
+def _uncover(X, Y, i, removed):
+    """
+    Undo _cover for matrix row i.
+    """
+    for j in reversed(Y[i]):
+        X[j] = removed.pop()
+        for k in X[j]:
+            for other in Y[k]:
+                if other != j:
+                    X[other].add(k)
+
+def _choose_column(X):
+    """
+    Return the column with the fewest rows, stopping early on 0 or 1.
+    """
+    best = None
+    best_len = None
+    for j, rows in X.items():
+        if best is None or len(rows) < best_len:
+            best = j
+            best_len = len(rows)
+            if best_len <= 1:
                 break
-        if board[row][col] == 0:
-            return None
-    return board if all(all(cell != 0 for cell in row) for row in board) else None
+    return best
+
+def _algorithm_x(X, Y, stats=None):
+    """
+    Iterative Algorithm X, always branching on the column with fewest rows.
+    Yields the list of selected matrix rows for every exact cover found.
+    """
+    if stats is None:
+        stats = SolveStats()
+    solution = []
+    removed = []
+    if not X:
+        yield solution
+        return
+    stack = [iter(list(X[_choose_column(X)]))]
+    stats.nodes += 1
+    while stack:
+        i = next(stack[-1], None)
+        if i is None:
+            stack.pop()
+            if solution:
+                _uncover(X, Y, solution.pop(), removed.pop())
+                stats.searched -= 1
+                stats.backtracks += 1
+            continue
+        removed.append(_cover(X, Y, i))
+        solution.append(i)
+        stats.searched += 1
+        if len(solution) > stats.max_depth:
+            stats.max_depth = len(solution)
+        if not X:
+            yield solution
+            _uncover(X, Y, solution.pop(), removed.pop())
+            stats.searched -= 1
+            continue
+        stack.append(iter(list(X[_choose_column(X)])))
+        stats.nodes += 1
+
+def dlx_solver(board, stats=None):
+    """
+    Solve the Sudoku puzzle as an exact-cover problem (Algorithm X).
+    Works for any N = k*k board.
+    Args:
+        board (list): The Sudoku puzzle to be solved.
+        stats (SolveStats): Optional search counters.
+    Returns:
+        list: A solved Sudoku board, or None if no solution exists.
+    """
+    matrix = _exact_cover(board)
+    if matrix is None:
+        return None
+    size = len(board)
+    for solution in _algorithm_x(*matrix, stats):
+        for i in solution:
+            cell, d = divmod(i, size)
+            r, c = divmod(cell, size)
+            board[r][c] = d + 1
+        return board
+    return None
+
+def dlx_count_solutions(board, limit=None):
+    """
+    Count the solutions of the Sudoku puzzle with the exact-cover engine.
+    Args:
+        board (list): The Sudoku puzzle (left unchanged).
+        limit (int): Stop counting once this many solutions are found.
+    Returns:
+        int: The number of solutions, capped at `limit`.
+    """
+    matrix = _exact_cover(board)
+    if matrix is None:
+        return 0
+    count = 0
+    for _ in _algorithm_x(*matrix):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+# Solvers compared by benchmark_solvers: key -> (label, solver(board, stats))
+SOLVERS = {
+    'dfs': ("DFS", lambda b, stats: dfs_solver(b, stats=stats)),
+    'dfs_trail': ("DFS (copy-free)", lambda b, stats: dfs_solver(b, copy_free=True, stats=stats)),
+    'backtracking': ("Backtracking", lambda b, stats: backtracking_solver(b, stats=stats)),
+    'backtracking_mrv': ("Backtracking (MRV)",
+        lambda b, stats: backtracking_solver(b, strategy="mrv", stats=stats)),
+    'backtracking_prop': ("Backtracking (MRV+prop)",
+        lambda b, stats: backtracking_solver(b, strategy="mrv", propagate=True, stats=stats)),
+    'dlx': ("Exact cover (DLX)", dlx_solver),
+    'greedy': ("Greedy", greedy_solver),
+}
 
 
 # Benchmarking Function
-def benchmark_solvers(sizes, trials):
+def benchmark_solvers(sizes, trials, track_memory=False):
     """
-    Benchmark the three Sudoku solving algorithms (DFS, Backtracking, Greedy) 
+    Benchmark the Sudoku solving algorithms registered in SOLVERS
     on different board sizes and clue counts.
     Args:
         sizes (list): A list of grid sizes
         trials (int): The number of trials to run for each size and clue count.
+        track_memory (bool): Also report each solver's peak allocation (tracemalloc).
     Returns:
-        dict: A dictionary containing the results of the benchmark for each algorithm.
+        tuple: Two dictionaries keyed by algorithm, size and clue count: the
+        solve times and the SolveStats counters (as dicts) of every trial.
     """
-    results = {
-        'dfs': defaultdict(lambda: defaultdict(list)),
-        'backtracking': defaultdict(lambda: defaultdict(list)),
-        'greedy': defaultdict(lambda: defaultdict(list))
-    }
+    results = {name: defaultdict(lambda: defaultdict(list)) for name in SOLVERS}
+    search_stats = {name: defaultdict(lambda: defaultdict(list)) for name in SOLVERS}
 
     for size in sizes:
         if size == 9:
@@ -146,48 +401,46 @@ def benchmark_solvers(sizes, trials):
                 board = generate_sudoku(size, clues)
                 print(f"  Trial {trial}/{trials}:")
 
-                # DFS
-                start = time.time()
-                try:
-                    dfs_solver(copy.deepcopy(board))
-                except Exception as e:
-                    print(f"    DFS failed: {e}")
-                dfs_time = time.time() - start
-                results['dfs'][size][clues].append(dfs_time)
-                print(f"    DFS time:         {dfs_time:.4f} seconds")
-
-                # Backtracking
-                start = time.time()
-                try:
-                    backtracking_solver(copy.deepcopy(board))
-                except Exception as e:
-                    print(f"    Backtracking failed: {e}")
-                bt_time = time.time() - start
-                results['backtracking'][size][clues].append(bt_time)
-                print(f"    Backtracking time: {bt_time:.4f} seconds")
-
-                # Greedy
-                start = time.time()
-                try:
-                    greedy_solver(copy.deepcopy(board))
-                except Exception as e:
-                    print(f"    Greedy failed: {e}")
-                greedy_time = time.time() - start
-                results['greedy'][size][clues].append(greedy_time)
-                print(f"    Greedy time:       {greedy_time:.4f} seconds")
-
-    return results
-
-
-def show_all_plots(results):
+                for name, (label, solver) in SOLVERS.items():
+                    stats = SolveStats()
+                    puzzle = copy.deepcopy(board)
+                    if track_memory:
+                        tracemalloc.start()
+                    start = time.time()
+                    try:
+                        solver(puzzle, stats)
+                    except Exception as e:
+                        print(f"    {label} failed: {e}")
+                    elapsed = time.time() - start
+                    if track_memory:
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                    results[name][size][clues].append(elapsed)
+                    search_stats[name][size][clues].append(stats.as_dict())
+                    fills = ""
+                    if stats.propagated or stats.searched:
+                        fills = (f" (propagation fills: {stats.propagated},"
+                                 f" search fills: {stats.searched})")
+                    print(f"    {label + ' time:':<40}{elapsed:.4f} seconds{fills}")
+                    print(f"    {label + ' search:':<40}nodes {stats.nodes}, checks {stats.checks},"
+                          f" backtracks {stats.backtracks}, max depth {stats.max_depth}")
+                    if track_memory:
+                        print(f"    {label + ' peak memory:':<40}{peak / 1024:.1f} KiB")
+
+    return results, search_stats
+
+
+def show_all_plots(results, search_stats=None):
     """
     Generate and display plots based on benchmarking results.
+    When `search_stats` is given, node, check and backtrack counts are
+    plotted next to the timings.
     """
     sizes = sorted(results['backtracking'].keys())
-    plt.figure(figsize=(15, 12))
+    plt.figure(figsize=(22, 12))
 
     # Plot 1: Performance by Grid Size (middle clue count)
-    plt.subplot(2, 2, 1)
+    plt.subplot(2, 3, 1)
     for method in results.keys():
         avg_times = []
         for size in sizes:
@@ -203,7 +456,7 @@ def show_all_plots(results):
     plt.yscale('log')
 
     # Plot 2: Performance by Clue Count (9x9)
-    plt.subplot(2, 2, 2)
+    plt.subplot(2, 3, 2)
     if 9 in sizes:
         clue_counts = sorted(results['backtracking'][9].keys())
         for method in results.keys():
@@ -217,7 +470,7 @@ def show_all_plots(results):
         plt.yscale('log')
 
     # Plot 3: Performance by Clue Count (16x16)
-    plt.subplot(2, 2, 3)
+    plt.subplot(2, 3, 3)
     if 16 in sizes:
         clue_counts = sorted(results['backtracking'][16].keys())
         for method in results.keys():
@@ -230,6 +483,27 @@ def show_all_plots(results):
         plt.legend()
         plt.yscale('log')
 
+    # Plots 4-6: Search counters by Grid Size (middle clue count)
+    if search_stats is not None:
+        for position, (metric, title) in enumerate([
+                ('nodes', 'Nodes Expanded'),
+                ('checks', 'Validity Checks'),
+                ('backtracks', 'Backtracks')], start=4):
+            plt.subplot(2, 3, position)
+            for method in search_stats.keys():
+                averages = []
+                for size in sizes:
+                    clues = sorted(search_stats[method][size].keys())[len(search_stats[method][size])//2]
+                    trials = search_stats[method][size][clues]
+                    averages.append(sum(t[metric] for t in trials)/len(trials))
+                plt.plot(sizes, averages, 'o-', label=method)
+            plt.title(f'{title} by Grid Size (Middle Clue Count)')
+            plt.xlabel('Grid Size')
+            plt.ylabel(title)
+            plt.grid(True)
+            plt.legend()
+            plt.yscale('symlog')
+
     plt.tight_layout()
     plt.savefig('sudoku_benchmark.png', dpi=300, bbox_inches='tight')
     plt.show()
@@ -240,8 +514,8 @@ if __name__ == "__main__":
     sizes_to_test = [9, 16]
     trials = 6
 
-    results = benchmark_solvers(
+    results, search_stats = benchmark_solvers(
         sizes=sizes_to_test,
         trials=trials
     )
-    show_all_plots(results)
+    show_all_plots(results, search_stats)
@@ -0,0 +1,602 @@
+"""
+Sudoku solver core.
+
+Board representation, constraint masks, solvers, generators and batch solving.
+Imports only the standard library, so it can be used without pygame, colorama
+or a display.
+"""
+import random
+import time
+import math
+import os
+from collections import deque
+
+
+# Sudoku Tools
+def is_valid(board, row, col, num):
+    """
+    Check if placing `num` at board[row][col] is valid according to Sudoku rules.
+    """
+    size = len(board)
+    base = int(size**0.5)
+    for i in range(size):
+        if num in (board[row][i], board[i][col]):
+            return False
+    start_row = base * (row // base)
+    start_col = base * (col // base)
+    for i in range(start_row, start_row + base):
+        for j in range(start_col, start_col + base):
+            if board[i][j] == num:
+                return False
+    return True
+
+_GEOMETRY = {}
+
+def board_geometry(size):
+    """
+    Return (box_of, units) for a board of the given size, computed once per size.
+    box_of[row][col] is the box index of a cell and units lists the
+    (row, col, box) cells of every row, column and box.
+    """
+    if size not in _GEOMETRY:
+        base = int(size**0.5)
+        box_of = [[(r // base) * base + c // base for c in range(size)] for r in range(size)]
+        cells = lambda coords: [(r, c, box_of[r][c]) for r, c in coords]
+        units = (
+            [cells((r, c) for c in range(size)) for r in range(size)] +
+            [cells((r, c) for r in range(size)) for c in range(size)] +
+            [cells((r, c) for r in range(br, br + base) for c in range(bc, bc + base))
+             for br in range(0, size, base) for bc in range(0, size, base)]
+        )
+        _GEOMETRY[size] = (box_of, units)
+    return _GEOMETRY[size]
+
+class BoardMasks:
+    """
+    Incremental constraint state for a Sudoku board.
+    Keeps one bitmask per row, column and box where bit `num` is set when `num`
+    is already placed in that unit, so validity checks are constant time.
+    `checks` counts the candidate lookups made on this state.
+    """
+    def __init__(self, board):
+        """
+        Build the masks from the digits already on the board.
+        """
+        self.board = board
+        self.size = len(board)
+        self.base = int(self.size**0.5)
+        self.all_digits = (1 << (self.size + 1)) - 2
+        self.box_of, self.units = board_geometry(self.size)
+        self.checks = 0
+        self.rows = [0] * self.size
+        self.cols = [0] * self.size
+        self.boxes = [0] * self.size
+        for row in range(self.size):
+            for col in range(self.size):
+                num = board[row][col]
+                if num:
+                    bit = 1 << num
+                    self.rows[row] |= bit
+                    self.cols[col] |= bit
+                    self.boxes[self.box_of[row][col]] |= bit
+
+    def box_index(self, row, col):
+        """
+        Return the index of the box containing (row, col).
+        """
+        return self.box_of[row][col]
+
+    def is_valid(self, row, col, num):
+        """
+        Check if `num` can be placed at (row, col) without breaking a constraint.
+        """
+        self.checks += 1
+        used = self.rows[row] | self.cols[col] | self.boxes[self.box_of[row][col]]
+        return not (used >> num) & 1
+
+    def candidates(self, row, col):
+        """
+        Return the bitmask of digits that can still be placed at (row, col).
+        """
+        self.checks += 1
+        used = self.rows[row] | self.cols[col] | self.boxes[self.box_of[row][col]]
+        return self.all_digits & ~used
+
+    def place(self, row, col, num):
+        """
+        Put `num` at (row, col) and mark it as used in its row, column and box.
+        """
+        bit = 1 << num
+        self.board[row][col] = num
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[self.box_of[row][col]] |= bit
+
+    def remove(self, row, col):
+        """
+        Clear (row, col) and release its digit in its row, column and box.
+        """
+        mask = ~(1 << self.board[row][col])
+        self.board[row][col] = 0
+        self.rows[row] &= mask
+        self.cols[col] &= mask
+        self.boxes[self.box_of[row][col]] &= mask
+
+    def undo(self, trail, mark):
+        """
+        Remove the placements recorded in `trail` after position `mark`.
+        """
+        while len(trail) > mark:
+            row, col = trail.pop()
+            self.remove(row, col)
+
+    def propagate(self, trail):
+        """
+        Fill naked singles (cells with one candidate) and hidden singles (digits
+        with one possible cell in a row, column or box) until none remain.
+        Every placement is appended to `trail` so it can be undone.
+        Returns False if the board reaches a contradiction.
+        """
+        board = self.board
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        all_digits = self.all_digits
+        checks = 0
+        progress = True
+        while progress:
+            progress = False
+            for unit in self.units:
+                once = twice = placed = 0
+                for row, col, box in unit:
+                    num = board[row][col]
+                    if num:
+                        placed |= 1 << num
+                        continue
+                    checks += 1
+                    candidates = all_digits & ~(rows[row] | cols[col] | boxes[box])
+                    if not candidates:
+                        self.checks += checks
+                        return False
+                    if not candidates & (candidates - 1):
+                        self.place(row, col, candidates.bit_length() - 1)
+                        trail.append((row, col))
+                        placed |= candidates
+                        progress = True
+                        continue
+                    twice |= once & candidates
+                    once |= candidates
+                if all_digits & ~(placed | once):
+                    self.checks += checks
+                    return False
+                for num in iter_digits(once & ~twice & ~placed):
+                    bit = 1 << num
+                    for row, col, box in unit:
+                        if board[row][col] == 0 and not (rows[row] | cols[col] | boxes[box]) & bit:
+                            self.place(row, col, num)
+                            trail.append((row, col))
+                            progress = True
+                            break
+                    else:
+                        self.checks += checks
+                        return False
+        self.checks += checks
+        return True
+
+    def copy(self):
+        """
+        Return an independent copy of the board and its masks.
+        """
+        clone = BoardMasks.__new__(BoardMasks)
+        clone.board = [row[:] for row in self.board]
+        clone.size = self.size
+        clone.base = self.base
+        clone.all_digits = self.all_digits
+        clone.box_of = self.box_of
+        clone.units = self.units
+        clone.checks = 0
+        clone.rows = self.rows[:]
+        clone.cols = self.cols[:]
+        clone.boxes = self.boxes[:]
+        return clone
+
+
+class SolveStats:
+    """
+    Counters collected while solving a board, shared by all Sudoku solvers.
+    `nodes` counts the search nodes expanded, `checks` the validity checks
+    (candidate lookups), `backtracks` the guesses undone and `max_depth` the
+    deepest guess level reached. `propagated` and `searched` count the cells
+    of the final board filled by constraint propagation and by search guesses.
+    """
+    FIELDS = ("nodes", "checks", "backtracks", "max_depth", "propagated", "searched")
+
+    def __init__(self):
+        """
+        Initializing counters.
+        """
+        self.nodes = 0
+        self.checks = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.propagated = 0
+        self.searched = 0
+
+    def as_dict(self):
+        """
+        Return the counters as a dictionary.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+def iter_digits(mask):
+    """
+    Yield the digits set in a candidate bitmask in increasing order.
+    """
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+def find_empty_cell(board):
+    """
+    Find the next empty cell (value 0) in the Sudoku board.
+    Returns a tuple (row, col) or None if no empty cells remain.
+    """
+    size = len(board)
+    for row in range(size):
+        for col in range(size):
+            if board[row][col] == 0:
+                return row, col
+    return None
+
+def find_most_constrained_cell(masks):
+    """
+    Find the empty cell with the fewest remaining candidates (MRV heuristic).
+    Returns a tuple (row, col) or None if no empty cells remain.
+    """
+    board = masks.board
+    best = None
+    best_count = masks.size + 1
+    for row in range(masks.size):
+        for col in range(masks.size):
+            if board[row][col] == 0:
+                count = bin(masks.candidates(row, col)).count("1")
+                if count < best_count:
+                    best = (row, col)
+                    best_count = count
+                    if count <= 1:
+                        return best
+    return best
+
+CELL_STRATEGIES = {
+    "first": lambda masks: find_empty_cell(masks.board),
+    "mrv": find_most_constrained_cell,
+}
+
+def generate_sudoku(clues=25, unique=False):
+    """
+    Generate a Sudoku puzzle with a given number of clues.
+    The more clues, the easier the puzzle.
+    With `unique`, clues are only removed while the puzzle keeps exactly one
+    solution, so the result may keep more clues than requested.
+    """
+    board = [[0] * 9 for _ in range(9)]
+    solve_backtracking(board)
+    if unique:
+        return remove_clues_unique(board, clues)
+    cells = [(i, j) for i in range(9) for j in range(9)]
+    random.shuffle(cells)
+    for i in range(81 - clues):
+        r, c = cells[i]
+        board[r][c] = 0
+    return board
+
+def remove_clues_unique(solution, clues):
+    """
+    Empty cells of a solved board in random order, keeping each removal only if
+    the puzzle still has exactly one solution. Stops at `clues` filled cells.
+    The solution digits are randomly relabelled first.
+    """
+    size = len(solution)
+    digits = random.sample(range(1, size + 1), size)
+    board = [[digits[num - 1] for num in row] for row in solution]
+    masks = BoardMasks(board)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    random.shuffle(cells)
+    filled = size * size
+    for row, col in cells:
+        if filled <= clues:
+            break
+        num = board[row][col]
+        masks.remove(row, col)
+        # The puzzle stays unique iff no other digit in this cell can be completed.
+        others = masks.candidates(row, col) & ~(1 << num)
+        for other in iter_digits(others):
+            masks.place(row, col, other)
+            solvable = count_solutions(masks, limit=1) > 0
+            masks.remove(row, col)
+            if solvable:
+                masks.place(row, col, num)
+                break
+        else:
+            filled -= 1
+    return board
+
+def count_solutions(board, limit=2, strategy="mrv", propagate=True, stats=None):
+    """
+    Count the solutions of a puzzle without storing them, stopping as soon as
+    `limit` are found (None counts them all). `board` may also be a BoardMasks
+    state. The board is left unchanged.
+    """
+    masks = board.copy() if isinstance(board, BoardMasks) else BoardMasks([row[:] for row in board])
+    count = 0
+    for _ in backtracking_search(masks, strategy, propagate, stats):
+        count += 1
+        if count == limit:
+            break
+    if stats is not None:
+        stats.checks += masks.checks
+    return count
+
+def iter_solutions(board, limit=None, strategy="mrv", propagate=True, stats=None):
+    """
+    Lazily yield solved copies of a puzzle, at most `limit` of them
+    (None streams them all). The board is left unchanged.
+    """
+    masks = BoardMasks([row[:] for row in board])
+    count = 0
+    for solved in backtracking_search(masks, strategy, propagate, stats):
+        yield [row[:] for row in solved]
+        count += 1
+        if count == limit:
+            return
+
+def solve_backtracking(board, strategy="first", propagate=False, stats=None):
+    """
+    Solve the Sudoku puzzle using backtracking.
+    `strategy` picks the next cell: "first" empty cell or "mrv" (fewest candidates).
+    With `propagate`, naked and hidden singles are filled before every branch.
+    Search counters are recorded in `stats` (a SolveStats) when given.
+    Returns True if the puzzle is solvable.
+    """
+    if stats is None:
+        stats = SolveStats()
+    masks = BoardMasks(board)
+    solved = next(backtracking_search(masks, strategy, propagate, stats), None) is not None
+    stats.checks += masks.checks
+    return solved
+
+def backtracking_search(masks, strategy="first", propagate=False, stats=None,
+                        on_place=None, on_remove=None):
+    """
+    Explicit-stack backtracking engine over a BoardMasks state, so board size
+    is not bounded by the recursion limit.
+    Yields the board every time it is completely filled; it holds the solution
+    until the generator is resumed. `on_place(row, col, num)` and
+    `on_remove(row, col)` are called for every search placement and undo
+    (propagation fills are not reported).
+    """
+    if stats is None:
+        stats = SolveStats()
+    select_cell = CELL_STRATEGIES[strategy]
+    trail = []
+    # Frames: [row, col, untried candidates, propagation mark, placed digit]
+    stack = []
+    expand = True
+    while True:
+        if expand:
+            stats.nodes += 1
+            if len(stack) > stats.max_depth:
+                stats.max_depth = len(stack)
+            mark = len(trail)
+            consistent = True
+            if propagate:
+                consistent = masks.propagate(trail)
+                stats.propagated += len(trail) - mark
+            if consistent:
+                empty = select_cell(masks)
+                if empty is None:
+                    yield masks.board
+                else:
+                    row, col = empty
+                    stack.append([row, col, masks.candidates(row, col), mark, 0])
+            if not consistent or empty is None:
+                stats.propagated -= len(trail) - mark
+                masks.undo(trail, mark)
+            expand = False
+        if not stack:
+            return
+        frame = stack[-1]
+        row, col, untried, mark, placed = frame
+        if placed:
+            masks.remove(row, col)
+            frame[4] = 0
+            stats.searched -= 1
+            stats.backtracks += 1
+            if on_remove:
+                on_remove(row, col)
+        if not untried:
+            stack.pop()
+            stats.propagated -= len(trail) - mark
+            masks.undo(trail, mark)
+            continue
+        bit = untried & -untried
+        num = bit.bit_length() - 1
+        frame[2] = untried ^ bit
+        frame[4] = num
+        masks.place(row, col, num)
+        stats.searched += 1
+        if on_place:
+            on_place(row, col, num)
+        expand = True
+
+
+# Batch Solving
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def parse_puzzle(line):
+    """
+    Parse a one-line puzzle ('.' or '0' for empty cells, e.g. 81 characters for
+    9x9) into a board. Digits above 9 are written as letters (A = 10).
+    """
+    line = line.strip()
+    size = math.isqrt(len(line))
+    if size * size != len(line) or math.isqrt(size) ** 2 != size:
+        raise ValueError(f"Invalid puzzle length {len(line)}: {line[:20]}...")
+    values = [0 if ch == "." else int(ch, 36) for ch in line]
+    if max(values) > size:
+        raise ValueError(f"Digit {DIGITS[max(values)]} does not fit a {size}x{size} puzzle")
+    return [values[row * size:(row + 1) * size] for row in range(size)]
+
+def format_puzzle(board):
+    """
+    Format a board as a one-line puzzle string, using '.' for empty cells.
+    """
+    return "".join("." if num == 0 else DIGITS[num] for row in board for num in row)
+
+def iter_puzzles(lines, on_error=None):
+    """
+    Lazily yield boards from an iterable of one-line puzzles.
+    Blank lines and lines starting with '#' are skipped. A malformed line
+    raises ValueError, unless `on_error(line_number, line, error)` is given;
+    then it is reported there and skipped.
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                board = parse_puzzle(line)
+            except ValueError as e:
+                if on_error is None:
+                    raise
+                on_error(line_number, line, e)
+                continue
+            yield board
+
+def read_puzzles(path, on_error=None):
+    """
+    Lazily yield boards from a file with one puzzle per line.
+    Malformed lines go to `on_error` (see iter_puzzles).
+    """
+    with open(path) as f:
+        yield from iter_puzzles(f, on_error)
+
+def solve_stream(lines, strategy="mrv", propagate=True, count_limit=None, on_error=None):
+    """
+    Solve one-line puzzles one at a time as they are read from `lines`.
+    Yields (board, result, seconds, stats) for each puzzle. `result` is True
+    when `board` was solved in place, or the number of solutions (capped at
+    `count_limit`) when counting. Malformed lines go to `on_error` (see
+    iter_puzzles).
+    """
+    for board in iter_puzzles(lines, on_error):
+        stats = SolveStats()
+        start = time.perf_counter()
+        if count_limit:
+            result = count_solutions(board, count_limit, strategy, propagate, stats)
+        else:
+            result = solve_backtracking(board, strategy, propagate, stats)
+        yield board, result, time.perf_counter() - start, stats
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class BatchReport:
+    """
+    Aggregate results of a solve_batch run.
+    """
+    def __init__(self):
+        """
+        Initializing counters.
+        """
+        self.puzzles = 0
+        self.solved = 0
+        self.invalid = 0
+        self.solve_time = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def puzzles_per_sec(self):
+        """
+        Throughput over the wall-clock time of the batch.
+        """
+        return self.puzzles / self.elapsed if self.elapsed else 0.0
+
+def _solve_chunk(chunk):
+    """
+    Solve a list of (index, board) pairs in a worker process.
+    Returns a list of (index, solution or None, seconds).
+    """
+    results = []
+    for index, board in chunk:
+        start = time.perf_counter()
+        solved = solve_backtracking(board, strategy="mrv", propagate=True)
+        results.append((index, board if solved else None, time.perf_counter() - start))
+    return results
+
+def _chunks(boards, chunksize):
+    """
+    Group boards into lists of (index, board) pairs of length `chunksize`.
+    """
+    chunk = []
+    for index, board in enumerate(boards):
+        chunk.append((index, board))
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def solve_batch(boards, workers=None, chunksize=64, ordered=True, report=None, on_error=None):
+    """
+    Solve many puzzles across a process pool.
+    `boards` is an iterable of boards or the path of a puzzle file (see read_puzzles).
+    For a path, malformed lines are passed to `on_error` and skipped (counted
+    in report.invalid; indexes then count valid puzzles only); without
+    `on_error` they raise ValueError.
+    Puzzles are sent to the workers in chunks of `chunksize`, with a bounded
+    number of chunks in flight so the input is consumed lazily.
+    Yields (index, solution or None, seconds) in input order, or in completion
+    order when `ordered` is False. Totals are written to `report` (a BatchReport).
+    """
+    # Imported here to keep the solver core cheap to import.
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    if report is None:
+        report = BatchReport()
+    if isinstance(boards, str):
+        def skip_invalid(line_number, line, error):
+            report.invalid += 1
+            on_error(line_number, line, error)
+        boards = read_puzzles(boards, skip_invalid if on_error else None)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    max_pending = 4 * workers
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        chunks = _chunks(boards, chunksize)
+        while True:
+            for chunk in chunks:
+                pending.append(pool.submit(_solve_chunk, chunk))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                for index, solution, seconds in future.result():
+                    report.puzzles += 1
+                    report.solved += solution is not None
+                    report.solve_time += seconds
+                    report.elapsed = time.perf_counter() - start
+                    yield index, solution, seconds
@@ -0,0 +1,115 @@
+"""
+Vectorized batch processing of Sudoku boards with NumPy.
+
+A batch of boards is stored as one integer array of shape (batch, N, N) with 0
+for empty cells. Candidate masks, naked-single fills and validity checks run on
+the whole batch at once; only the boards that are still unsolved afterwards go
+through the cell-by-cell backtracker.
+"""
+import numpy as np
+from sudoku_core import solve_backtracking
+
+
+def to_array(boards):
+    """
+    Stack boards in the generate_sudoku list-of-lists format into a (batch, N, N) array.
+    """
+    return np.array(boards, dtype=np.int64).reshape(len(boards), len(boards[0]), len(boards[0]))
+
+def to_boards(grid):
+    """
+    Convert a (batch, N, N) array back into a list of list-of-lists boards.
+    """
+    return grid.tolist()
+
+def _digit_bits(grid):
+    """
+    Return the array with every placed digit d replaced by the bit 1 << d (0 if empty).
+    """
+    return np.where(grid > 0, np.left_shift(1, grid), 0)
+
+def _box_view(bits):
+    """
+    Reshape (batch, N, N) to (batch, band, row, stack, col) so boxes are axes 2 and 4.
+    """
+    batch, size, _ = bits.shape
+    base = int(size**0.5)
+    return bits.reshape(batch, base, base, base, base)
+
+def candidate_masks(grid):
+    """
+    Compute the candidate bitmask of every cell in the batch (bit d set when
+    digit d can still go there). Filled cells get 0.
+    """
+    batch, size, _ = grid.shape
+    base = int(size**0.5)
+    bits = _digit_bits(grid)
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    boxes = np.bitwise_or.reduce(np.bitwise_or.reduce(_box_view(bits), axis=4), axis=2)
+    boxes = np.repeat(np.repeat(boxes, base, axis=1), base, axis=2)
+    used = rows[:, :, None] | cols[:, None, :] | boxes
+    all_digits = (1 << (size + 1)) - 2
+    return np.where(grid == 0, all_digits & ~used, 0)
+
+def find_conflicts(grid):
+    """
+    Return a boolean array marking boards that repeat a digit in a row, column
+    or box, or that have an empty cell with no candidates left.
+    """
+    bits = _digit_bits(grid)
+    boxes = _box_view(bits)
+    duplicate = np.zeros(grid.shape[0], dtype=bool)
+    for total, union in (
+            (bits.sum(axis=2), np.bitwise_or.reduce(bits, axis=2)),
+            (bits.sum(axis=1), np.bitwise_or.reduce(bits, axis=1)),
+            (boxes.sum(axis=(2, 4)),
+             np.bitwise_or.reduce(np.bitwise_or.reduce(boxes, axis=4), axis=2))):
+        duplicate |= (total != union).reshape(grid.shape[0], -1).any(axis=1)
+    dead_cell = ((grid == 0) & (candidate_masks(grid) == 0)).any(axis=(1, 2))
+    return duplicate | dead_cell
+
+def check_solved(grid):
+    """
+    Return a boolean array marking boards that are completely and validly filled.
+    """
+    return (grid != 0).all(axis=(1, 2)) & ~find_conflicts(grid)
+
+def fill_naked_singles(grid):
+    """
+    Repeatedly fill every empty cell that has exactly one candidate, across the
+    whole batch at once, until no board changes. Modifies `grid` in place.
+    Returns the number of cells filled per board.
+    """
+    filled = np.zeros(grid.shape[0], dtype=np.int64)
+    while True:
+        candidates = candidate_masks(grid)
+        singles = (candidates != 0) & ((candidates & (candidates - 1)) == 0)
+        if not singles.any():
+            return filled
+        # frexp gives the exponent of an exact power of two: 2**d -> d + 1
+        digits = np.frexp(candidates.astype(np.float64))[1] - 1
+        grid[singles] = digits[singles]
+        filled += singles.sum(axis=(1, 2))
+
+def solve_boards(boards):
+    """
+    Solve a batch of boards: fill naked singles in bulk, then run the
+    backtracker only on the boards that are still unsolved.
+    Returns a list with a solved board, or None, for every input board.
+    """
+    if not boards:
+        return []
+    grid = to_array(boards)
+    fill_naked_singles(grid)
+    solved = check_solved(grid)
+    dead = find_conflicts(grid)
+    results = []
+    for board, is_solved, is_dead in zip(to_boards(grid), solved, dead):
+        if is_solved:
+            results.append(board)
+        elif is_dead:
+            results.append(None)
+        else:
+            results.append(board if solve_backtracking(board, "mrv", True) else None)
+    return results
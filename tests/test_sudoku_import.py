@@ -0,0 +1,36 @@
+"""
+Import-time budget for the headless Sudoku core.
+"""
+import json
+import os
+import subprocess
+import sys
+
+GAMES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "games")
+IMPORT_BUDGET_US = 50_000  # 50 ms cumulative for `import sudoku_core`
+DISPLAY_MODULES = ("pygame", "colorama", "tkinter")
+
+
+def _import_core():
+    """
+    Import sudoku_core in a fresh interpreter with -X importtime.
+    Returns (display modules loaded, import-time stderr lines).
+    """
+    code = ("import json, sys, sudoku_core; "
+            f"print(json.dumps([m for m in {DISPLAY_MODULES!r} if m in sys.modules]))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=GAMES_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout), result.stderr.splitlines()
+
+
+def test_core_does_not_load_display_modules():
+    loaded, _ = _import_core()
+    assert loaded == []
+
+
+def test_core_import_time_within_budget():
+    _, lines = _import_core()
+    cumulative = [int(line.split("|")[1]) for line in lines
+                  if line.startswith("import time:") and line.split("|")[2].strip() == "sudoku_core"]
+    assert cumulative, "sudoku_core missing from -X importtime output"
+    assert cumulative[0] <= IMPORT_BUDGET_US, f"import sudoku_core took {cumulative[0]} us"